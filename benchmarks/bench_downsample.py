@@ -0,0 +1,51 @@
+"""Time drawing a price line at growing lengths, with and without downsampling.
+
+    python benchmarks/bench_downsample.py
+    python benchmarks/bench_downsample.py --points 100000 10000000
+
+Each run plots a synthetic minute-bar series on a 6.4 x 4.8 inch Agg figure
+and times reduction plus ``canvas.draw()``.
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile.downsample import plot_downsampled  # noqa: E402
+
+
+def time_line(x, y, method):
+    fig = Figure()
+    ax = fig.add_subplot()
+    start = time.perf_counter()
+    if method == 'full':
+        ax.plot(x, y)
+    else:
+        plot_downsampled(ax, x, y, method=method)
+    fig.canvas.draw()
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+',
+                        default=[10_000, 100_000, 1_000_000, 10_000_000])
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{'points':>12} {'full s':>9} {'minmax s':>9} {'lttb s':>9}")
+    for n in args.points:
+        x = np.datetime64('2000-01-01T00:00') + np.arange(n).astype('timedelta64[m]')
+        y = 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, n)))
+        timings = [time_line(x, y, method) for method in ('full', 'minmax', 'lttb')]
+        print(f'{n:>12,} ' + ' '.join(f'{t:>9.3f}' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
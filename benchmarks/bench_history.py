@@ -0,0 +1,58 @@
+"""Time multi-year quarterly aggregation of a large minute-bar CSV.
+
+    python benchmarks/bench_history.py --rows 20000000 --workers 4
+
+A synthetic minute CSV (``--rows`` bars from 2017 on, about 120 bytes a
+row) is aggregated per year+quarter twice: streamed in one process with
+:func:`stock_profile.streaming.stream_quarterly`, and split into byte
+ranges across a process pool with
+:func:`stock_profile.streaming.parallel_quarterly`. Peak RSS is reported
+for the parent and for the largest worker; neither grows with the file.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run import write_synthetic  # noqa: E402
+from stock_profile.streaming import PARTITION_BYTES, parallel_quarterly, stream_quarterly  # noqa: E402
+
+
+def _max_rss_mib(who):
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--partition-mib', type=int, default=PARTITION_BYTES // 2**20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.csv')
+        write_synthetic(path, args.rows, 100, 0)
+        size = os.path.getsize(path)
+        print(f'{args.rows:,} rows, {size / 2**20:,.0f} MiB')
+
+        start = time.perf_counter()
+        serial = stream_quarterly(path, by='year')
+        print(f'stream_quarterly:   {time.perf_counter() - start:7.2f}s  '
+              f'parent max RSS {_max_rss_mib(resource.RUSAGE_SELF):,.0f} MiB')
+
+        start = time.perf_counter()
+        parallel = parallel_quarterly(path, by='year', workers=args.workers,
+                                      partition_bytes=args.partition_mib * 2**20)
+        print(f'parallel_quarterly: {time.perf_counter() - start:7.2f}s  '
+              f'{args.workers} workers, worker max RSS {_max_rss_mib(resource.RUSAGE_CHILDREN):,.0f} MiB')
+
+    assert list(parallel) == list(serial)
+    assert all(parallel[q].count == serial[q].count for q in serial)
+    print(f'{len(serial)} quarters, {list(serial)[0]} to {list(serial)[-1]}')
+
+
+if __name__ == '__main__':
+    main()
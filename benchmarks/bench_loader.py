@@ -0,0 +1,47 @@
+"""Time loading many price CSVs one after another vs concurrently.
+
+    python benchmarks/bench_loader.py --files 300 --rows 5000
+
+Writes ``--files`` synthetic daily CSVs to a temporary directory, then
+loads them all with a plain ``load_prices`` loop and with
+:func:`stock_profile.loader.load_many`, both parsing the CSVs (no Parquet
+cache) and both reading a warm cache.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run import write_synthetic  # noqa: E402
+from stock_profile.data import load_prices  # noqa: E402
+from stock_profile.loader import load_many  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=32)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        paths = [os.path.join(data_dir, f'T{i}.csv') for i in range(args.files)]
+        for i, path in enumerate(paths):
+            write_synthetic(path, args.rows, 100, seed=i)
+        print(f"{'mode':<8} {'sequential s':>13} {'load_many s':>12} {'p50 ms':>8} {'p99 ms':>8}")
+        for mode, use_cache in (('csv', False), ('cache', True)):
+            if use_cache:
+                load_many(paths, args.workers)
+            start = time.perf_counter()
+            for path in paths:
+                load_prices(path, use_cache=use_cache)
+            sequential = time.perf_counter() - start
+            _, report = load_many(paths, args.workers, use_cache=use_cache)
+            p50, p99 = report['seconds'].quantile([.5, .99]) * 1000
+            print(f'{mode:<8} {sequential:>13.3f} {report.attrs["wall_seconds"]:>12.3f} {p50:>8.2f} {p99:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Time writing many 300 dpi charts: savefig vs the background output stage.
+
+    python benchmarks/bench_output.py --charts 40 --levels 1 6
+
+Each chart is a two-panel price comparison over synthetic data, rendered
+with ``bbox_inches='tight'`` into a temporary directory. ``savefig`` draws
+and encodes on the main thread; ``stage`` rasterises on the main thread and
+encodes on an :class:`OutputStage` thread pool, to separate PNGs or to one
+zip archive.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile import charts  # noqa: E402
+from stock_profile.output import OutputStage  # noqa: E402
+
+
+def synthetic_figures(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2000-01-01', periods=5000, freq='D')
+    for _ in range(n):
+        a, b = (pd.DataFrame({'Price': 100 * np.exp(np.cumsum(rng.normal(0, .01, len(dates))))},
+                             index=dates) for _ in range(2))
+        yield charts.comparison_chart(Figure(), a, b)
+
+
+def run_savefig(n, out_dir, level):
+    for i, fig in enumerate(synthetic_figures(n)):
+        fig.savefig(os.path.join(out_dir, f'{i}.png'), dpi=300, bbox_inches='tight',
+                    pil_kwargs={'compress_level': level})
+
+
+def run_stage(n, out_dir, level, workers, archive=None):
+    with OutputStage(out_dir, archive, level, workers) as output:
+        for i, fig in enumerate(synthetic_figures(n)):
+            output.save(fig, f'{i}.png', dpi=300, bbox_inches='tight')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--charts', type=int, default=20)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    print(f"{'level':>5} {'savefig s':>10} {'stage s':>10} {'archive s':>10}")
+    for level in args.levels:
+        timings = []
+        for run in (lambda d: run_savefig(args.charts, d, level),
+                    lambda d: run_stage(args.charts, d, level, args.workers),
+                    lambda d: run_stage(args.charts, d, level, args.workers, 'charts.zip')):
+            with tempfile.TemporaryDirectory() as out_dir:
+                start = time.perf_counter()
+                run(out_dir)
+                timings.append(time.perf_counter() - start)
+        print(f'{level:>5} ' + ' '.join(f'{t:>10.2f}' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
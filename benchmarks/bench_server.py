@@ -0,0 +1,103 @@
+"""Load test for the chart data server: requests per second and latency percentiles.
+
+    python benchmarks/bench_server.py --rows 2000000 --clients 64 --requests 50
+
+Writes synthetic minute-bar CSVs for two tickers, starts
+``python -m stock_profile.server`` on a free port and opens ``--clients``
+keep-alive connections that each send ``--requests`` pan/zoom requests.
+A ``--hot`` share of requests hits a few popular ranges (the case the LRU
+cache is for); the rest ask for random windows and widths.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from run import write_synthetic  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TICKERS = ('NFLX', 'DJI')
+
+
+def request_targets(n, dates, hot, seed):
+    rng = np.random.default_rng(seed)
+    first, last = dates
+    span = (last - first).astype('int64')
+    popular = [f'/series?ticker={ticker}&width=1200' for ticker in TICKERS]
+    popular += [f'/distribution?ticker={ticker}' for ticker in TICKERS]
+    targets = []
+    for _ in range(n):
+        if rng.random() < hot:
+            targets.append(popular[rng.integers(len(popular))])
+            continue
+        a, b = np.sort(rng.integers(0, span, 2))
+        start = (first + np.timedelta64(int(a), 'm')).astype('datetime64[m]')
+        end = (first + np.timedelta64(int(b), 'm')).astype('datetime64[m]')
+        endpoint = 'distribution' if rng.random() < .2 else 'series'
+        targets.append(f'/{endpoint}?ticker={TICKERS[rng.integers(2)]}&start={start}&end={end}'
+                       f'&width={rng.integers(300, 2000)}&format={"bin" if rng.random() < .5 else "json"}')
+    return targets
+
+
+async def client(port, targets, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for target in targets:
+        start = time.perf_counter()
+        writer.write(f'GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n'.encode())
+        head = await reader.readuntil(b'\r\n\r\n')
+        length = int(next(line.split(b':')[1] for line in head.split(b'\r\n')
+                          if line.lower().startswith(b'content-length')))
+        await reader.readexactly(length)
+        if not head.startswith(b'HTTP/1.1 200'):
+            raise RuntimeError(f'{target}: {head.splitlines()[0].decode()}')
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load(port, clients, requests, dates, hot):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, request_targets(requests, dates, hot, seed), latencies)
+                           for seed in range(clients)))
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='minute bars per ticker')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50, help='requests per client')
+    parser.add_argument('--hot', type=float, default=.8, help='share of requests for popular ranges')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        sources = []
+        for i, ticker in enumerate(TICKERS):
+            path = os.path.join(data_dir, f'{ticker}.csv')
+            write_synthetic(path, args.rows, 100 * (i + 1), seed=i)
+            sources.append(f'{ticker}={path}')
+        server = subprocess.Popen([sys.executable, '-m', 'stock_profile.server', '--port', '0', *sources],
+                                  cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        try:
+            port = int(server.stdout.readline().rsplit(':', 1)[1])
+            first = np.datetime64('2017-01-01T00:00')
+            dates = (first, first + np.timedelta64(args.rows - 1, 'm'))
+            seconds, latencies = asyncio.run(load(port, args.clients, args.requests, dates, args.hot))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f'{len(latencies)} requests from {args.clients} clients in {seconds:.2f}s')
+    print(f'{len(latencies) / seconds:,.0f} requests/s')
+    for q in (50, 90, 99):
+        print(f'p{q}: {np.percentile(latencies, q) * 1000:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
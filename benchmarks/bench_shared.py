@@ -0,0 +1,96 @@
+"""Time handing a large price frame to pool workers: pickled vs shared memory.
+
+    python benchmarks/bench_shared.py --rows 10000000 --workers 16
+
+A synthetic minute-bar frame (Date index, Price, Volume and a Quarter
+Categorical, as ``load_prices`` gives) is sent to ``--tasks`` tasks (default:
+one per worker) on a fresh process pool, which each reduce it to
+per-quarter mean price and total volume. ``pickle`` passes the frame as the
+task argument, so every task serialises and copies all of it; ``shared``
+publishes it once with :func:`stock_profile.shared.publish` and passes the
+spec, so workers attach to the same pages. Pool start-up is timed
+separately so only the handoff and the work are compared.
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile import shared  # noqa: E402
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2000-01-03', periods=rows, freq='min', name='Date')
+    return pd.DataFrame({
+        'Price': 100 * np.exp(np.cumsum(rng.normal(0, 1e-4, rows))),
+        'Volume': rng.integers(1_000, 1_000_000, rows),
+        'Quarter': pd.Categorical.from_codes(dates.quarter - 1, ['Q1', 'Q2', 'Q3', 'Q4']),
+    }, index=dates)
+
+
+def _reduce(frame):
+    by_quarter = frame.groupby('Quarter', observed=True)
+    return by_quarter['Price'].mean().to_numpy(), by_quarter['Volume'].sum().to_numpy()
+
+
+def _pickled_task(frame):
+    return _reduce(frame)
+
+
+def _shared_task(spec):
+    return _reduce(shared.attach(spec))
+
+
+def _noop():
+    return None
+
+
+def _run(frame, mode, workers, tasks):
+    with ProcessPoolExecutor(workers) as pool:
+        start = time.perf_counter()
+        for future in [pool.submit(_noop) for _ in range(workers)]:
+            future.result()
+        startup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if mode == 'pickle':
+            results = [f.result() for f in [pool.submit(_pickled_task, frame) for _ in range(tasks)]]
+        else:
+            with shared.publish(frame) as published:
+                results = [f.result() for f in [pool.submit(_shared_task, published.spec) for _ in range(tasks)]]
+        return time.perf_counter() - start, startup, results[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--tasks', type=int, default=None, help='tasks to run (default: one per worker)')
+    args = parser.parse_args(argv)
+    tasks = args.tasks or args.workers
+
+    frame = synthetic_frame(args.rows)
+    pickled = len(pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL))
+    with shared.publish(frame) as published:
+        segment, spec = published.nbytes, len(pickle.dumps(published.spec))
+    print(f'{args.rows:,} rows, {tasks} tasks on {args.workers} workers')
+    print(f'pickle: {pickled / 2**20:,.1f} MiB per task, {tasks * pickled / 2**20:,.0f} MiB copied')
+    print(f'shared: {segment / 2**20:,.1f} MiB segment written once, {spec} bytes per task')
+
+    expected = _reduce(frame)
+    for mode in ('pickle', 'shared'):
+        seconds, startup, result = _run(frame, mode, args.workers, tasks)
+        assert all(np.allclose(a, b) for a, b in zip(result, expected))
+        print(f'{mode:>6}: {seconds:7.3f}s ({seconds / tasks * 1000:,.1f} ms per task, '
+              f'pool start-up {startup:.2f}s not included)')
+
+
+if __name__ == '__main__':
+    main()
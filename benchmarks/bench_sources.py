@@ -0,0 +1,59 @@
+"""Time refreshing many tickers from the local quote server: one by one vs pooled batches.
+
+    python benchmarks/bench_sources.py --tickers 2000 --latency-ms 50 --fail-rate 0.02
+
+Starts ``python -m stock_profile.quote_server`` with the given per-response
+latency and failure rate, then fetches every ticker through
+:class:`stock_profile.sources.HttpSource` twice with the response cache
+off: one ticker per request over a single connection, like a scripted
+series of manual downloads, and in ``--batch-size`` batches over
+``--connections`` pooled keep-alive connections.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile.sources import HttpSource  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--fail-rate', type=float, default=0.02)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--sequential-sample', type=int, default=100,
+                        help='tickers fetched one by one; the total is extrapolated')
+    args = parser.parse_args(argv)
+
+    server = subprocess.Popen([sys.executable, '-m', 'stock_profile.quote_server', '--port', '0',
+                               '--latency-ms', str(args.latency_ms), '--fail-rate', str(args.fail_rate)],
+                              cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    try:
+        url = server.stdout.readline().split()[-1]
+        tickers = [f'T{i}' for i in range(args.tickers)]
+        sample = tickers[:args.sequential_sample]
+        runs = (('one by one', sample, {'batch_size': 1, 'connections': 1}),
+                ('pooled', tickers, {'batch_size': args.batch_size, 'connections': args.connections}))
+        for name, batch, options in runs:
+            with HttpSource(url, cache_dir=None, **options) as source:
+                start = time.perf_counter()
+                frames = source.prices(batch)
+                seconds = time.perf_counter() - start
+            total = seconds * args.tickers / len(batch)
+            print(f'{name:<11} {len(frames):>6} tickers in {seconds:7.2f}s '
+                  f'(~{total:.1f}s for {args.tickers}); requests {source.stats["requests"]}, '
+                  f'retries {source.stats["retries"]}')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
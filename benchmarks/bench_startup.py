@@ -0,0 +1,50 @@
+"""Measure interpreter start-up cost of the notebook imports vs the data core.
+
+    python benchmarks/bench_startup.py --repeat 10
+
+Each case runs in a fresh interpreter; the table shows the median wall time
+over ``--repeat`` runs and whether matplotlib was imported along the way.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    'bare interpreter': 'pass',
+    'notebook cell 2': 'from matplotlib import pyplot as plt\nimport pandas as pd\nimport seaborn as sns',
+    'data core': ('import stock_profile.data, stock_profile.streaming, stock_profile.analytics, '
+                  'stock_profile.resample, stock_profile.index, stock_profile.earnings'),
+    'build (checks only)': 'import stock_profile.build',
+    'charts on first use': 'import stock_profile.charts\nimport matplotlib.figure',
+}
+
+
+def run_case(code, repeat):
+    probe = code + "\nimport sys\nprint('matplotlib' in sys.modules)"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', probe], env=env, check=True,
+                             capture_output=True, text=True).stdout
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), out.strip() == 'True'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    print(f"{'case':<22} {'median ms':>10}  matplotlib")
+    for name, code in CASES.items():
+        seconds, loaded = run_case(code, args.repeat)
+        print(f'{name:<22} {seconds * 1000:>10.0f}  {"yes" if loaded else "no"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Build the quarterly summary for many tickers and time reading chart inputs from it.
+
+    python benchmarks/bench_summary.py --tickers 500 --years 20
+
+Synthetic daily prices for every ticker are summarised once with
+:func:`stock_profile.summary.build_summary` and written to Parquet. Then
+every ticker's 20-year quarterly profile inputs (median and 5/25/75/95%
+quantiles) are read back two ways: per ticker from the summary file, and
+recomputed from that ticker's daily rows, read from a per-ticker Parquet
+file like the ``load_prices`` cache, as a chart without the summary would.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile.summary import build_summary, read_summary, write_summary  # noqa: E402
+
+PROFILE_COLUMNS = ['days', 'p05', 'p25', 'p50', 'p75', 'p95']
+
+
+def synthetic_prices(n_tickers, years, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2017-12-29', periods=years * 252, name='Date')
+    for i in range(n_tickers):
+        close = rng.uniform(10, 500) * np.exp(np.cumsum(rng.normal(0, .015, len(dates))))
+        yield f'T{i}', pd.DataFrame({'Price': close, 'Volume': rng.integers(10**5, 10**7, len(dates))},
+                                    index=dates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--years', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    prices = dict(synthetic_prices(args.tickers, args.years))
+    raw_bytes = sum(frame.memory_usage(index=True).sum() for frame in prices.values())
+    with tempfile.TemporaryDirectory() as out_dir:
+        path = os.path.join(out_dir, 'quarterly_summary.parquet')
+        start = time.perf_counter()
+        table = build_summary(prices)
+        write_summary(table, path)
+        print(f'build: {time.perf_counter() - start:.2f}s for {len(table):,} rows; '
+              f'{os.path.getsize(path) / 2**10:,.0f} KiB on disk vs {raw_bytes / 2**20:,.0f} MiB of daily rows')
+
+        start = time.perf_counter()
+        for ticker in prices:
+            rows = read_summary(path, [ticker], PROFILE_COLUMNS)
+        from_summary = time.perf_counter() - start
+        row_bytes = rows.memory_usage(index=True).sum()
+
+        for ticker, frame in prices.items():
+            frame.to_parquet(os.path.join(out_dir, f'{ticker}.parquet'))
+        start = time.perf_counter()
+        for ticker in prices:
+            frame = pd.read_parquet(os.path.join(out_dir, f'{ticker}.parquet'))
+            frame['Price'].groupby(frame.index.to_period('Q')).quantile([.05, .25, .5, .75, .95]).unstack()
+        from_daily = time.perf_counter() - start
+    print(f'profile inputs for {args.tickers} tickers: summary {from_summary:.2f}s '
+          f'({row_bytes / 2**10:.1f} KiB per ticker), daily rows {from_daily:.2f}s '
+          f'({raw_bytes / len(prices) / 2**10:.0f} KiB per ticker)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Time rendering one chart layout for many tickers: fresh figures vs templates.
+
+    python benchmarks/bench_templates.py --tickers 200
+
+Every ticker gets the vs-benchmark, EPS and revenue/earnings charts with
+synthetic data, saved to PNG in a temporary directory. The ``fresh`` run
+builds a new figure per chart as the notebook does; the ``template`` run
+reuses one figure per chart from a :class:`TemplatePool`.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile import charts  # noqa: E402
+from stock_profile.earnings import earnings_frame  # noqa: E402
+from stock_profile.templates import TemplatePool  # noqa: E402
+
+QUARTERS = ['1Q2017', '2Q2017', '3Q2017', '4Q2017']
+
+
+def synthetic_tickers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2017-01-01', periods=12, freq='MS')
+    benchmark = pd.DataFrame({'Price': 20000 * np.exp(np.cumsum(rng.normal(0, .02, 12)))}, index=dates)
+    tickers = []
+    for i in range(n):
+        prices = pd.DataFrame({'Price': 100 * np.exp(np.cumsum(rng.normal(0, .05, 12)))}, index=dates)
+        actual = rng.uniform(.1, .5, 4)
+        earnings = earnings_frame(f'T{i}', QUARTERS, actual, actual + rng.normal(0, .02, 4))
+        revenue = rng.uniform(2, 4, 4)
+        tickers.append((f'T{i}', prices, earnings, revenue, revenue * rng.uniform(.02, .1, 4)))
+    return benchmark, tickers
+
+
+def render_fresh(benchmark, tickers, out_dir):
+    for name, prices, earnings, revenue, profit in tickers:
+        charts.comparison_chart(Figure(), prices, benchmark, (name, 'Benchmark')).savefig(
+            os.path.join(out_dir, f'{name}_vs.png'), dpi=100, bbox_inches='tight')
+        charts.eps_chart(Figure(), earnings).savefig(os.path.join(out_dir, f'{name}_eps.png'))
+        charts.revenue_earnings_chart(Figure(), QUARTERS, revenue, profit, name=name).savefig(
+            os.path.join(out_dir, f'{name}_revenue.png'))
+
+
+def render_templates(benchmark, tickers, out_dir):
+    pool = TemplatePool()
+    for name, prices, earnings, revenue, profit in tickers:
+        pool.render('comparison', prices, benchmark, (name, 'Benchmark')).savefig(
+            os.path.join(out_dir, f'{name}_vs.png'), dpi=100, bbox_inches='tight')
+        pool.render('eps', earnings).savefig(os.path.join(out_dir, f'{name}_eps.png'))
+        pool.render('revenue', QUARTERS, revenue, profit, name=name).savefig(
+            os.path.join(out_dir, f'{name}_revenue.png'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=100)
+    args = parser.parse_args(argv)
+
+    benchmark, tickers = synthetic_tickers(args.tickers)
+    with tempfile.TemporaryDirectory() as out_dir:
+        timings = {}
+        for mode, render in (('fresh', render_fresh), ('template', render_templates)):
+            start = time.perf_counter()
+            render(benchmark, tickers, out_dir)
+            timings[mode] = time.perf_counter() - start
+    for mode, seconds in timings.items():
+        print(f'{mode:<9} {seconds:8.2f}s  {seconds / args.tickers * 1000:7.1f} ms/ticker')
+    print(f"speedup   {timings['fresh'] / timings['template']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Time the quarterly violin chart: seaborn vs the binned FFT KDE engine.
+
+    python benchmarks/bench_violin.py                      # 1M and 100M rows
+    python benchmarks/bench_violin.py --rows 1000000 --skip-seaborn-above 1000000
+
+Both paths draw four violins of synthetic prices grouped by quarter onto an
+Agg canvas; the timing covers density estimation and drawing.
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile.charts import violin_from_frame  # noqa: E402
+
+
+def synthetic_quarterly(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 140 * np.exp(np.cumsum(rng.normal(0, 1e-4, rows)))
+    quarters = pd.Categorical.from_codes(np.arange(rows) * 4 // rows, ['Q1', 'Q2', 'Q3', 'Q4'])
+    return pd.DataFrame({'Price': prices, 'Quarter': quarters})
+
+
+def time_render(draw, frame):
+    fig = Figure()
+    ax = fig.add_subplot()
+    start = time.perf_counter()
+    draw(ax, frame)
+    fig.canvas.draw()
+    return time.perf_counter() - start
+
+
+def seaborn_violin(ax, frame):
+    import seaborn as sns
+    sns.violinplot(data=frame, x='Quarter', y='Price', ax=ax)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 100_000_000])
+    parser.add_argument('--skip-seaborn-above', type=int, default=None,
+                        help='only time seaborn for row counts up to this')
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>12} {'seaborn s':>10} {'binned s':>10} {'speedup':>8}")
+    for rows in args.rows:
+        frame = synthetic_quarterly(rows)
+        binned = time_render(violin_from_frame, frame)
+        if args.skip_seaborn_above is None or rows <= args.skip_seaborn_above:
+            baseline = time_render(seaborn_violin, frame)
+            print(f'{rows:>12,} {baseline:>10.3f} {binned:>10.3f} {baseline / binned:>7.1f}x')
+        else:
+            print(f"{rows:>12,} {'skipped':>10} {binned:>10.3f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
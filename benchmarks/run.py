@@ -0,0 +1,207 @@
+"""Stage-by-stage benchmark of the Stock Profile charts.
+
+    python benchmarks/run.py --sizes 1000 1000000 --out bench.json
+    python benchmarks/run.py --sizes 100000000 --skip-seaborn-above 1000000
+
+For each size, synthetic NFLX- and DJI-shaped CSVs with that many rows are
+written to a temporary directory, then every stage of the notebook's charts
+is timed separately: CSV load, the ``Price`` rename, quarterly grouping, the
+violin KDE, the grouped bar layout, the dual-subplot line chart and
+``savefig``. Stages that have a faster engine in ``stock_profile`` are timed
+both ways, as variant ``notebook`` and variant ``engine`` (``cached`` is a
+second ``load_prices`` call served from the Parquet cache). Every result
+records wall time and the peak memory traced while the stage ran.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stock_profile import charts  # noqa: E402
+from stock_profile.data import NETFLIX_REVENUE_2017, load_prices  # noqa: E402
+from stock_profile.downsample import plot_downsampled  # noqa: E402
+
+WRITE_CHUNK = 1_000_000
+
+
+def write_synthetic(path, rows, start_price, seed):
+    """Yahoo-shaped daily (or, past ~10k rows, minute) bars with a Quarter column."""
+    rng = np.random.default_rng(seed)
+    freq = 'D' if rows <= 10_000 else 'min'
+    start = pd.Timestamp('2017-01-01')
+    price = start_price
+    for offset in range(0, rows, WRITE_CHUNK):
+        n = min(WRITE_CHUNK, rows - offset)
+        dates = pd.date_range(start, periods=n, freq=freq)
+        start = dates[-1] + pd.tseries.frequencies.to_offset(freq)
+        close = price * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+        price = close[-1]
+        pd.DataFrame({
+            'Date': dates.strftime('%Y-%m-%d %H:%M') if freq == 'min' else dates.strftime('%Y-%m-%d'),
+            'Open': close * 0.999, 'High': close * 1.002, 'Low': close * 0.997,
+            'Close': close, 'Adj Close': close,
+            'Volume': rng.integers(1_000_000, 100_000_000, n),
+            'Quarter': 'Q' + dates.quarter.astype(str),
+        }).to_csv(path, mode='w' if offset == 0 else 'a', header=offset == 0, index=False)
+
+
+class Recorder:
+    """Runs each stage once for wall time and, since tracing slows Python
+    allocations down, once more under tracemalloc for its peak memory."""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.results = []
+
+    def time(self, rows, stage, variant, fn, *args, **kwargs):
+        start = time.perf_counter()
+        value = fn(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        peak = None
+        if self.memory:
+            tracemalloc.start()
+            fn(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.results.append({'rows': rows, 'stage': stage, 'variant': variant,
+                             'seconds': seconds, 'peak_bytes': peak})
+        memory = '' if peak is None else f'{peak / 2**20:>10.1f} MiB'
+        print(f'{rows:>12,} {stage:<20} {variant:<9} {seconds:>9.4f}s {memory}')
+        return value
+
+
+def _rename(frame):
+    # A shallow copy, so the memory run renames 'Adj Close' again rather than a no-op.
+    frame = frame.copy(deep=False)
+    frame.rename(columns={'Adj Close': 'Price'}, inplace=True)
+    return frame
+
+
+def _cold_load(path, workdir):
+    # A fresh cache directory per call, so both runs parse the CSV and write the cache.
+    return load_prices(path, cache_dir=tempfile.mkdtemp(dir=workdir))
+
+
+def _group_quarters(frame):
+    return {quarter: rows['Price'] for quarter, rows in frame.groupby('Quarter')}
+
+
+def _seaborn_violin(frame):
+    import seaborn as sns
+    fig = Figure()
+    sns.violinplot(data=frame, x='Quarter', y='Price', ax=fig.add_subplot())
+    fig.canvas.draw()
+    return fig
+
+
+def _binned_violin(frame):
+    fig = Figure()
+    charts.violin_from_frame(fig.add_subplot(), frame)
+    fig.canvas.draw()
+    return fig
+
+
+def _notebook_bars(values):
+    fig = Figure()
+    ax = fig.add_subplot()
+    n_series, n_groups = values.shape
+    for n in range(n_series):
+        ax.bar([n_series * element + .8 * (n + 1) for element in range(n_groups)], values[n])
+    fig.canvas.draw()
+    return fig
+
+
+def _engine_bars(values):
+    fig = Figure()
+    charts.grouped_bars(fig.add_subplot(), values)
+    fig.canvas.draw()
+    return fig
+
+
+def _dual_subplot(netflix, dowjones, downsample):
+    fig = Figure()
+    for i, (frame, title) in enumerate([(netflix, 'Netflix'), (dowjones, 'Dow Jones')], 1):
+        ax = fig.add_subplot(1, 2, i)
+        ax.set_title(title)
+        if downsample:
+            plot_downsampled(ax, frame['Date'].to_numpy(), frame['Price'].to_numpy())
+        else:
+            ax.plot(frame['Date'].to_numpy(), frame['Price'].to_numpy())
+        ax.tick_params(axis='x', labelrotation=90)
+    fig.subplots_adjust(wspace=.5)
+    fig.canvas.draw()
+    return fig
+
+
+def _savefig(fig, path):
+    fig.savefig(path, dpi=100, bbox_inches='tight')
+
+
+def run_size(rows, workdir, recorder, skip_seaborn_above=None):
+    netflix_csv = os.path.join(workdir, f'NFLX_{rows}.csv')
+    dowjones_csv = os.path.join(workdir, f'DJI_{rows}.csv')
+    write_synthetic(netflix_csv, rows, 140.0, seed=1)
+    write_synthetic(dowjones_csv, rows, 20000.0, seed=2)
+
+    netflix = recorder.time(rows, 'csv_load', 'notebook', pd.read_csv, netflix_csv)
+    dowjones = pd.read_csv(dowjones_csv, parse_dates=['Date'])
+    recorder.time(rows, 'csv_load', 'engine', _cold_load, netflix_csv, workdir)
+    load_prices(netflix_csv, cache_dir=workdir)
+    recorder.time(rows, 'csv_load', 'cached', load_prices, netflix_csv, cache_dir=workdir)
+    netflix = recorder.time(rows, 'price_rename', 'notebook', _rename, netflix)
+    dowjones = _rename(dowjones)
+    netflix['Date'] = pd.to_datetime(netflix['Date'])
+    recorder.time(rows, 'quarterly_grouping', 'notebook', _group_quarters, netflix)
+
+    if skip_seaborn_above is None or rows <= skip_seaborn_above:
+        recorder.time(rows, 'violin_kde', 'notebook', _seaborn_violin, netflix)
+    recorder.time(rows, 'violin_kde', 'engine', _binned_violin, netflix)
+
+    values = np.random.default_rng(0).random((6, 40)) * np.array(NETFLIX_REVENUE_2017['revenue']).mean()
+    recorder.time(rows, 'grouped_bar_layout', 'notebook', _notebook_bars, values)
+    recorder.time(rows, 'grouped_bar_layout', 'engine', _engine_bars, values)
+
+    recorder.time(rows, 'dual_subplot', 'notebook', _dual_subplot, netflix, dowjones, False)
+    fig = recorder.time(rows, 'dual_subplot', 'engine', _dual_subplot, netflix, dowjones, True)
+    recorder.time(rows, 'savefig', 'notebook', _savefig, fig, os.path.join(workdir, 'chart.png'))
+
+    for path in (netflix_csv, dowjones_csv):
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 1_000_000])
+    parser.add_argument('--out', default='bench_results.json', help='JSON results file')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced peak-memory runs')
+    parser.add_argument('--skip-seaborn-above', type=int, default=None,
+                        help='only time the seaborn violin up to this many rows')
+    args = parser.parse_args(argv)
+
+    recorder = Recorder(memory=not args.no_memory)
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            run_size(rows, workdir, recorder, args.skip_seaborn_above)
+
+    meta = {'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'matplotlib': matplotlib.__version__}
+    with open(args.out, 'w') as f:
+        json.dump({'meta': meta, 'results': recorder.results}, f, indent=1)
+    print(f'wrote {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -50,7 +50,12 @@
    "source": [
     "from matplotlib import pyplot as plt\n",
     "import pandas as pd\n",
-    "import seaborn as sns"
+    "\n",
+    "from stock_profile.charts import eps_scatter, grouped_bars, violin_from_aggregates\n",
+    "from stock_profile.data import NETFLIX_EPS_2017, load_prices\n",
+    "from stock_profile.downsample import plot_downsampled\n",
+    "from stock_profile.earnings import earnings_frame, surprises\n",
+    "from stock_profile.streaming import update_quarterly"
    ]
   },
   {
@@ -104,7 +109,7 @@
     }
    ],
    "source": [
-    "netflix_stocks = pd.read_csv('NFLX.csv')\n",
+    "netflix_stocks = load_prices('NFLX.csv')\n",
     "print(netflix_stocks.head())"
    ]
   },
@@ -143,7 +148,7 @@
     }
    ],
    "source": [
-    "dowjones_stocks = pd.read_csv('DJI.csv')\n",
+    "dowjones_stocks = load_prices('DJI.csv')\n",
     "print(dowjones_stocks.head())"
    ]
   },
@@ -180,7 +185,7 @@
     }
    ],
    "source": [
-    "netflix_stocks_quarterly = pd.read_csv('NFLX_daily_by_quarter.csv')\n",
+    "netflix_stocks_quarterly = load_prices('NFLX_daily_by_quarter.csv')\n",
     "print(netflix_stocks_quarterly.head())"
    ]
   },
@@ -385,6 +390,7 @@
    "metadata": {},
    "outputs": [],
    "source": [
+    "# load_prices already renames 'Adj Close' to 'Price'; these calls are now no-ops.\n",
     "netflix_stocks.rename(columns={'Adj Close':'Price'}, inplace=True)\n",
     "dowjones_stocks.rename(columns={'Adj Close':'Price'}, inplace=True)\n",
     "netflix_stocks_quarterly.rename(columns={'Adj Close':'Price'}, inplace=True)"
@@ -684,7 +690,10 @@
     }
    ],
    "source": [
-    "ax = sns.violinplot(data = netflix_stocks_quarterly , x = 'Quarter', y = 'Price')\n",
+    "# Saved per-quarter aggregates, updated with only the rows appended since the last run.\n",
+    "quarterly_aggregates = update_quarterly('NFLX_daily_by_quarter.csv')\n",
+    "ax = plt.subplot()\n",
+    "violin_from_aggregates(ax, quarterly_aggregates)\n",
     "ax.set_title(\"Distribution of 2017 Netflix Stock Prices by Quarter\")\n",
     "ax.set_ylabel(\"Closing Stock Price\")\n",
     "ax.set_xlabel(\"Business Quarters in 2017\")\n",
@@ -755,13 +764,9 @@
     }
    ],
    "source": [
-    "x_positions = [1, 2, 3, 4]\n",
-    "chart_labels = [\"1Q2017\",\"2Q2017\",\"3Q2017\",\"4Q2017\"]\n",
-    "earnings_actual =[.4, .15,.29,.41]\n",
-    "earnings_estimate = [.37,.15,.32,.41 ]\n",
-    "plt.scatter(x_positions, earnings_actual, color = 'red')\n",
-    "plt.scatter(x_positions, earnings_estimate, color = 'blue', alpha = .5)\n",
-    "plt.legend([\"Actual\", \"Estimate\"])\n",
+    "# Swap in read_earnings('earnings.parquet') to chart any ticker's reported EPS.\n",
+    "earnings = surprises(earnings_frame('NFLX', **NETFLIX_EPS_2017))\n",
+    "eps_scatter(plt.subplot(), earnings)\n",
     "plt.title(\"Earnings Per Share in Cents\")\n",
     "plt.show()\n"
    ]
@@ -842,31 +847,11 @@
     "earnings_by_quarter = [.0656,.12959,.18552,.29012]\n",
     "quarter_labels = [\"2Q2017\",\"3Q2017\",\"4Q2017\", \"1Q2018\"]\n",
     "\n",
-    "# Revenue\n",
-    "n = 1  # This is our first dataset (out of 2)\n",
-    "t = 2 # Number of dataset\n",
-    "d = 4 # Number of sets of bars\n",
-    "w = .8 # Width of each bar\n",
-    "bars1_x = [t*element + w*n for element\n",
-    "             in range(d)]\n",
-    "\n",
-    "plt.bar(bars1_x, revenue_by_quarter)\n",
-    "\n",
-    "# Earnings\n",
-    "n = 2  # This is our second dataset (out of 2)\n",
-    "t = 2 # Number of dataset\n",
-    "d = 4 # Number of sets of bars\n",
-    "w = .8 # Width of each bar\n",
-    "bars2_x = [t*element + w*n for element\n",
-    "             in range(d)]\n",
-    "\n",
-    "plt.bar(bars2_x, earnings_by_quarter)\n",
-    "\n",
-    "\n",
-    "\n",
-    "middle_x = [ (a + b) / 2.0 for a, b in zip(bars1_x, bars2_x)]\n",
+    "# One row per dataset, one column per set of bars; grouped_bars lays out\n",
+    "# every bar at once (dataset n of t in group d sits at t*d + w*n).\n",
+    "ax = plt.subplot()\n",
     "labels = [\"Revenue\", \"Earnings\"]\n",
-    "plt.legend(labels)\n",
+    "grouped_bars(ax, [revenue_by_quarter, earnings_by_quarter], quarter_labels, labels, width=.8)\n",
     "plt.title(\"Netflix Revenue and Earnings in $ Billions\")\n",
     "plt.savefig('revenue&earning.png')\n",
     "plt.show()"
@@ -954,7 +939,7 @@
     "ax1.set_xlabel('Date')\n",
     "ax1.set_ylabel('Price')\n",
     "ax1.set_title(\"Netflix\")\n",
-    "plt.plot(netflix_stocks['Date'], netflix_stocks['Price'])\n",
+    "plot_downsampled(ax1, netflix_stocks.index, netflix_stocks['Price'].to_numpy())\n",
     "plt.xticks(rotation='vertical')\n",
     "\n",
     "\n",
@@ -967,12 +952,11 @@
     "ax2.set_xlabel('Date')\n",
     "ax2.set_ylabel('Stock Price')\n",
     "ax2.set_title('Dow Jones')\n",
-    "plt.plot(dowjones_stocks['Date'], dowjones_stocks['Price'], color= 'Red')\n",
+    "plot_downsampled(ax2, dowjones_stocks.index, dowjones_stocks['Price'].to_numpy(), color= 'Red')\n",
     "plt.subplots_adjust(wspace=.5)\n",
     "plt.xticks(rotation='vertical')\n",
     "plt.savefig(\"netflix_chart11.png\",dpi=100, bbox_inches='tight')\n",
-    "plt.show()\n",
-    "plt.savefig(\"test.png\", dpi=100, bbox_inches='tight')\n"
+    "plt.show()\n"
    ]
   },
   {
@@ -1026,7 +1010,9 @@
     }
    ],
    "source": [
-    "plt.savefig(\"netflix10_chart.png\",dpi=300, bbox_inches='tight')"
+    "# Saving after plt.show() writes a blank figure; render every chart headlessly instead.\n",
+    "from stock_profile.render import render_all\n",
+    "render_all()"
    ]
   },
   {
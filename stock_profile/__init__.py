@@ -0,0 +1 @@
+"""Data and charting helpers for the Netflix Stock Profile notebook."""
@@ -0,0 +1,104 @@
+"""Relative performance of stocks against a benchmark such as the Dow.
+
+Everything works on a date x ticker price matrix against one benchmark
+series, so one call covers Netflix alone or thousands of tickers. Rolling
+beta, correlation and tracking error come from windowed sums taken as
+differences of cumulative sums, which costs O(n) per ticker whatever the
+window length.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def align(prices, benchmark):
+    """Inner-join ``prices`` (a Series or date x ticker DataFrame) with the
+    ``benchmark`` Series on their Date index."""
+    if isinstance(prices, pd.Series):
+        prices = prices.to_frame(prices.name or 'Price')
+    joined = prices.join(benchmark.rename('__benchmark__'), how='inner').sort_index()
+    return joined.drop(columns='__benchmark__'), joined['__benchmark__']
+
+
+def rebased(prices, base=100.0):
+    """Prices scaled so every column's first valid price is ``base``."""
+    return prices / prices.bfill().iloc[0] * base
+
+
+def log_returns(prices):
+    """Period-over-period log returns; one row shorter than ``prices``."""
+    return np.log(prices).diff().iloc[1:]
+
+
+def rolling_sum(values, window):
+    """Sums over each trailing ``window`` rows of a 1-D or 2-D array, via cumsum.
+
+    Returns ``len(values) - window + 1`` rows, the first covering rows
+    ``0..window-1``. NaNs count as zero, so one gap does not spread into
+    every later sum; count the valid rows the same way to tell short windows.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = np.where(np.isnan(values), 0.0, values)
+    totals = np.cumsum(values, axis=0)
+    out = totals[window - 1:].copy()
+    out[1:] -= totals[:-window]
+    return out
+
+
+def rolling_statistics(returns, benchmark_returns, window):
+    """Rolling beta, correlation and tracking error of each ``returns`` column.
+
+    ``returns`` is an (n, k) array and ``benchmark_returns`` has length n.
+    Returns are centred on their full-sample means first, which leaves the
+    covariances unchanged but keeps the cumulative sums from losing
+    precision on long histories. Rows where a column or the benchmark is
+    NaN (e.g. before a ticker listed) are left out of that column's sums,
+    and windows with fewer than ``window`` valid pairs are NaN. Each result
+    has ``n - window + 1`` rows.
+    """
+    x = np.asarray(returns, dtype='float64')
+    y = np.asarray(benchmark_returns, dtype='float64')[:, None]
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    with warnings.catch_warnings():
+        # A column with no valid pairs has no mean; its windows all end up NaN.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        x = np.where(valid, x - np.nanmean(np.where(valid, x, np.nan), axis=0), 0.0)
+        y = np.where(valid, y - np.nanmean(y), 0.0)
+    n = window
+    short = rolling_sum(valid, n) < n
+    sum_x, sum_y = rolling_sum(x, n), rolling_sum(y, n)
+    cov = (rolling_sum(x * y, n) - sum_x * sum_y / n) / (n - 1)
+    var_x = np.maximum((rolling_sum(x * x, n) - sum_x ** 2 / n) / (n - 1), 0)
+    var_y = np.maximum((rolling_sum(y * y, n) - sum_y ** 2 / n) / (n - 1), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = cov / var_y
+        correlation = cov / np.sqrt(var_x * var_y)
+    # Var(x - y) = Var(x) + Var(y) - 2 Cov(x, y)
+    tracking_error = np.sqrt(np.maximum(var_x + var_y - 2 * cov, 0))
+    for values in (beta, correlation, tracking_error):
+        values[short] = np.nan
+    return {'beta': beta, 'correlation': correlation, 'tracking_error': tracking_error}
+
+
+def relative_performance(prices, benchmark, window=20, periods_per_year=None):
+    """Compare ``prices`` (Series or date x ticker DataFrame) with ``benchmark``.
+
+    Returns a dict of Date-indexed DataFrames with one column per ticker:
+    ``rebased`` (with the benchmark as an extra ``benchmark`` column),
+    ``log_returns``, and the rolling ``beta``, ``correlation`` and
+    ``tracking_error`` over ``window`` returns. Pass ``periods_per_year``
+    (252 for daily, 12 for monthly bars) to annualise the tracking error.
+    """
+    prices, benchmark = align(prices, benchmark)
+    returns = log_returns(prices)
+    benchmark_returns = log_returns(benchmark)
+    stats = rolling_statistics(returns.to_numpy(), benchmark_returns.to_numpy(), window)
+    if periods_per_year:
+        stats['tracking_error'] = stats['tracking_error'] * np.sqrt(periods_per_year)
+    rolling_index = returns.index[window - 1:]
+    result = {'rebased': rebased(prices).assign(benchmark=rebased(benchmark)),
+              'log_returns': returns}
+    for name, values in stats.items():
+        result[name] = pd.DataFrame(values, index=rolling_index, columns=prices.columns)
+    return result
@@ -0,0 +1,158 @@
+"""Incremental chart builds: only re-render charts whose inputs changed.
+
+    python -m stock_profile.build --data-dir . --out-dir charts
+
+Each chart is a :class:`Target` naming the slice of data it draws (e.g. just
+the Q4 rows for the Q4 violin) and the parameters it is drawn with. The
+notebook's charts, their files and savefig options come from
+:data:`stock_profile.render.CHARTS`; only the per-quarter violins are
+build-specific. A target's key is a content hash of those inputs, the
+parameters and the drawing function. Keys and PNG hashes of the last build
+are kept in a manifest in the output directory; a target is skipped when its
+key is unchanged and its PNG is still the one that build wrote. A new trading
+day in Q4 therefore only re-renders the Q4 violin and the full-year
+distribution chart.
+
+Bump ``CHART_VERSION`` when drawing code changes so every chart rebuilds.
+"""
+import argparse
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from stock_profile import charts, render, trace
+from stock_profile.data import load_prices
+
+CHART_VERSION = 4
+MANIFEST = '.build_manifest.json'
+
+# ``render(fig, *inputs, **params)`` draws the chart; ``inputs`` are frames,
+# arrays, plain values or containers of them, and ``params`` must be JSON
+# serialisable.
+Target = namedtuple('Target', 'name output render inputs params save_options', defaults=({},))
+
+
+def _hash_input(digest, value):
+    # Frames and arrays by content; containers and plain objects (e.g. summary
+    # QuarterProfiles) field by field; anything else by its repr.
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        dtypes = value.dtypes if isinstance(value, pd.DataFrame) else [value.dtype]
+        digest.update(json.dumps([list(map(str, columns)), list(map(str, dtypes))]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype.str}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            digest.update(repr(key).encode())
+            _hash_input(digest, item)
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _hash_input(digest, item)
+    elif hasattr(value, '__dict__'):
+        digest.update(type(value).__qualname__.encode())
+        _hash_input(digest, vars(value))
+    else:
+        digest.update(repr(value).encode())
+
+
+def target_key(target):
+    """Content hash of everything that determines how ``target`` looks."""
+    digest = hashlib.sha256()
+    digest.update(f'{CHART_VERSION}|{target.render.__module__}.{target.render.__qualname__}'.encode())
+    digest.update(json.dumps([target.params, target.save_options], sort_keys=True, default=str).encode())
+    _hash_input(digest, list(target.inputs))
+    return digest.hexdigest()
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def build(targets, out_dir='.', force=False):
+    """Render the targets that are out of date; returns ``{name: 'built' | 'skipped'}``."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _load_manifest(out_dir)
+    status = {}
+    for target in targets:
+        path = os.path.join(out_dir, target.output)
+        key = target_key(target)
+        previous = manifest.get(target.output)
+        if not force and previous and previous['key'] == key \
+                and os.path.exists(path) and _file_hash(path) == previous['png']:
+            status[target.name] = 'skipped'
+            continue
+        # Matplotlib is only imported once something actually needs drawing.
+        from matplotlib.figure import Figure
+
+        with trace.stage('figure', chart=target.name):
+            fig = target.render(Figure(), *target.inputs, **target.params)
+        with trace.stage('savefig', chart=target.name, path=path):
+            fig.savefig(path, **target.save_options)
+        manifest[target.output] = {'key': key, 'png': _file_hash(path)}
+        _save_manifest(out_dir, manifest)
+        status[target.name] = 'built'
+    return status
+
+
+def quarter_violin(fig, rows, quarter, name='Netflix', period='2017'):
+    """A single quarter's price distribution."""
+    ax = fig.add_subplot()
+    charts.violin_from_frame(ax, rows)
+    ax.set_title(f'Distribution of {period} {name} Stock Prices in {quarter}')
+    ax.set_ylabel('Closing Stock Price')
+    return fig
+
+
+def notebook_targets(data_dir='.'):
+    """Targets for every chart in :data:`stock_profile.render.CHARTS`, drawn from
+    the same inputs and saved the same way, plus one violin per quarter."""
+    render.netflix_summary(data_dir)
+    targets = []
+    for name, (load, filename, save_options) in render.CHARTS.items():
+        draw, inputs = load(data_dir)
+        targets.append(Target(name, filename, draw, tuple(inputs), {}, save_options))
+    quarterly = load_prices(os.path.join(data_dir, 'NFLX_daily_by_quarter.csv'))[['Price', 'Quarter']]
+    for quarter, rows in quarterly.groupby('Quarter', observed=True):
+        targets.append(Target(f'distribution_{quarter}', f'quarterlyDistribution2017_{quarter}.png',
+                              quarter_violin, (rows,), {'quarter': quarter}))
+    return targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Re-render only the Stock Profile charts whose data changed.')
+    parser.add_argument('--data-dir', default='.')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--force', action='store_true', help='re-render every chart')
+    args = parser.parse_args(argv)
+    for name, state in build(notebook_targets(args.data_dir), args.out_dir, args.force).items():
+        print(f'{name}: {state}')
+
+
+if __name__ == '__main__':
+    main()
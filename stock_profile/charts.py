@@ -0,0 +1,273 @@
+"""Chart drawing for the Stock Profile figures.
+
+Functions here draw onto an existing Matplotlib ``Axes`` so they work the
+same in the notebook and in headless batch rendering. Matplotlib itself is
+only imported inside the drawing functions: importing this module, e.g. to
+check whether charts are up to date, does not pay for it.
+"""
+import numpy as np
+import pandas as pd
+
+from stock_profile.downsample import plot_downsampled
+from stock_profile.kde import binned_densities, histogram_quantiles, violin_curves
+
+
+def draw_violins(ax, labels, grids, densities, quartiles, width=0.8, scale='area'):
+    """Draw one violin per label from precomputed density curves.
+
+    ``quartiles`` holds a (q25, median, q75) triple per violin. With
+    ``scale='area'`` widths are scaled by the largest density across all
+    violins, so areas compare; ``scale='width'`` gives every violin the same
+    maximum width, which keeps a long history with a wide price range readable.
+    """
+    import matplotlib
+
+    if scale not in ('area', 'width'):
+        raise ValueError(f"scale must be 'area' or 'width', not {scale!r}")
+    colors = matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
+    peak = max((density.max() for density in densities if len(density)), default=0)
+    for i, (grid, density, (q25, median, q75)) in enumerate(zip(grids, densities, quartiles)):
+        if not len(density) or not density.max():
+            # No spread to draw (e.g. no rows yet): a flat line at the median.
+            ax.hlines(median, i - width / 2, i + width / 2, color=colors[i % len(colors)], linewidth=2)
+            continue
+        half = density / (peak if scale == 'area' else density.max()) * width / 2
+        ax.fill_betweenx(grid, i - half, i + half, facecolor=colors[i % len(colors)],
+                         edgecolor='0.25', linewidth=1)
+        ax.vlines(i, q25, q75, color='0.25', linewidth=4)
+        ax.scatter([i], [median], color='white', s=12, zorder=3)
+    ax.set_xticks(range(len(labels)))
+    ax.set_xticklabels(labels)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+
+
+def violin_from_frame(ax, frame, x='Quarter', y='Price'):
+    """Violins of ``frame[y]`` grouped by ``frame[x]``, like ``sns.violinplot``.
+
+    Densities come from the binned FFT engine in :mod:`stock_profile.kde`,
+    so drawing costs O(rows + bins) rather than O(rows x grid) per group.
+    """
+    codes, labels = pd.factorize(frame[x], sort=True)
+    binned = binned_densities(frame[y].to_numpy(), codes, len(labels))
+    curves = violin_curves(binned)
+    quartiles = histogram_quantiles(binned['hist'], binned['grid'], [0.25, 0.5, 0.75])
+    draw_violins(ax, list(labels), [g for g, _ in curves], [d for _, d in curves], quartiles)
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    return ax
+
+
+def violin_from_aggregates(ax, aggregates, scale='area'):
+    """Quarterly distribution violins from ``{quarter: QuarterAggregate}``.
+
+    Only the aggregates' sketch buckets are read, as weighted points, so
+    this works for data streamed by :func:`stock_profile.streaming.stream_quarterly`.
+    """
+    points = [aggregate.kde_points() for aggregate in aggregates.values()]
+    values = np.concatenate([v for v, _ in points])
+    weights = np.concatenate([w for _, w in points])
+    codes = np.repeat(np.arange(len(points)), [len(v) for v, _ in points])
+    curves = violin_curves(binned_densities(values, codes, len(points), weights=weights))
+    quartiles = [aggregate.quantile([0.25, 0.5, 0.75]) for aggregate in aggregates.values()]
+    draw_violins(ax, list(aggregates), [g for g, _ in curves], [d for _, d in curves], quartiles,
+                 scale=scale)
+    ax.set_xlabel('Quarter')
+    ax.set_ylabel('Price')
+    return ax
+
+
+def label_distribution(ax, name='Netflix', period='2017'):
+    """Title and axis labels of :func:`distribution_chart`, for redrawn violins too."""
+    ax.set_title(f'Distribution of {period} {name} Stock Prices by Quarter')
+    ax.set_ylabel('Closing Stock Price')
+    ax.set_xlabel(f'Business Quarters in {period}')
+    return ax
+
+
+def distribution_chart(fig, aggregates, name='Netflix', period='2017'):
+    """The notebook's Step 5 chart: price distribution per quarter."""
+    ax = fig.add_subplot()
+    violin_from_aggregates(ax, aggregates)
+    label_distribution(ax, name, period)
+    return fig
+
+
+def history_distribution_chart(fig, aggregates, name='Netflix'):
+    """Price distribution for every quarter of a multi-year history.
+
+    ``aggregates`` is keyed by '2017Q1'-style labels, e.g. from
+    :func:`stock_profile.streaming.parallel_quarterly`. Violins share a
+    maximum width and only each year's first quarter is labelled.
+    """
+    labels = list(aggregates)
+    years = [label[:4] for label in labels]
+    fig.set_size_inches(max(6.4, .12 * len(labels)), 4.8)
+    ax = fig.add_subplot()
+    violin_from_aggregates(ax, aggregates, scale='width')
+    ticks = [i for i, year in enumerate(years) if i == 0 or year != years[i - 1]]
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([years[i] for i in ticks], rotation=90)
+    ax.set_title(f'Distribution of {name} Stock Prices by Quarter, {years[0]}-{years[-1]}')
+    ax.set_xlabel('Year')
+    ax.set_ylabel('Closing Stock Price')
+    return fig
+
+
+def quarterly_profile_chart(fig, rows, name='Netflix'):
+    """Quarterly price profile over many years from summary rows.
+
+    ``rows`` are one ticker's rows of the :mod:`stock_profile.summary`
+    table: the median line sits in a 25-75% band inside a 5-95% band.
+    """
+    rows = rows[rows['days'].notna()]
+    x = pd.PeriodIndex(rows['quarter'], freq='Q').to_timestamp(how='end')
+    ax = fig.add_subplot()
+    ax.fill_between(x, rows['p05'], rows['p95'], color='C0', alpha=.2, linewidth=0, label='5-95%')
+    ax.fill_between(x, rows['p25'], rows['p75'], color='C0', alpha=.4, linewidth=0, label='25-75%')
+    ax.plot(x, rows['p50'], color='C0', label='Median')
+    ax.set_title(f'{name} Quarterly Price Profile')
+    ax.set_xlabel('Quarter')
+    ax.set_ylabel('Price')
+    ax.legend(loc='upper left')
+    return fig
+
+
+def eps_scatter(ax, earnings, actual_color='red', estimate_color='blue'):
+    """Actual and estimated EPS per quarter as one batched scatter.
+
+    ``earnings`` has ``Quarter``, ``Actual`` and ``Estimate`` columns (see
+    :mod:`stock_profile.earnings`); rows for several tickers share their
+    quarter's x position. Estimates are drawn half transparent so matching
+    points blend to purple, as in the notebook.
+    """
+    from matplotlib.lines import Line2D
+
+    offsets, facecolors, labels = eps_points(earnings, actual_color, estimate_color)
+    ax.scatter(offsets[:, 0], offsets[:, 1], c=facecolors)
+    ax.legend([Line2D([], [], marker='o', linestyle='', color=color) for color in facecolors[[0, -1]]],
+              ['Actual', 'Estimate'])
+    ax.set_xticks(range(1, len(labels) + 1))
+    ax.set_xticklabels(labels)
+    return ax
+
+
+def eps_points(earnings, actual_color='red', estimate_color='blue'):
+    """Scatter offsets, RGBA colours and quarter labels for :func:`eps_scatter`.
+
+    Actual points come first, then estimates, in ``earnings`` row order.
+    Quarters are placed in date order whatever order the rows are in.
+    """
+    from matplotlib.colors import to_rgba_array
+
+    from stock_profile.summary import quarter_period
+
+    codes, labels = pd.factorize(earnings['Quarter'])
+    try:
+        order = np.argsort([quarter_period(label) for label in labels], kind='stable')
+    except ValueError:
+        order = np.arange(len(labels))  # not quarter labels: keep them as they come
+    codes = np.argsort(order)[codes]
+    labels = labels[order]
+    x_positions = codes + 1
+    colors = to_rgba_array([actual_color, estimate_color])
+    colors[1, 3] = .5
+    offsets = np.column_stack([
+        np.concatenate([x_positions, x_positions]),
+        np.concatenate([earnings['Actual'].to_numpy(), earnings['Estimate'].to_numpy()])])
+    return offsets, np.repeat(colors, len(earnings), axis=0), list(labels)
+
+
+def eps_chart(fig, earnings):
+    """The notebook's Step 6 chart: actual vs estimated earnings per share."""
+    ax = fig.add_subplot()
+    eps_scatter(ax, earnings)
+    ax.set_title('Earnings Per Share in Cents')
+    return fig
+
+
+def grouped_bar_positions(n_series, n_groups, width=.8):
+    """Left-to-right bar centres for ``n_series`` bars in each of ``n_groups`` groups.
+
+    Returns an ``(n_series, n_groups)`` array laid out like the notebook's
+    side-by-side bars: group ``g`` starts at ``g * n_series`` and series
+    ``s`` sits ``width * (s + 1)`` into it.
+    """
+    return np.arange(n_groups)[None, :] * n_series + width * np.arange(1, n_series + 1)[:, None]
+
+
+def grouped_bar_corners(values, width=.8):
+    """Rectangle corners for grouped bars of an ``(n_series, n_groups)`` array.
+
+    Returns ``(corners, centers)``: corners has shape ``(n_series * n_groups,
+    4, 2)``, one polygon per bar in series-major order, and centers is the
+    array from :func:`grouped_bar_positions`.
+    """
+    values = np.asarray(values, dtype='float64')
+    centers = grouped_bar_positions(*values.shape, width)
+    left, right = centers - width / 2, centers + width / 2
+    zeros = np.zeros_like(values)
+    corners = np.stack([np.stack([left, zeros], -1), np.stack([left, values], -1),
+                        np.stack([right, values], -1), np.stack([right, zeros], -1)], axis=2)
+    return corners.reshape(-1, 4, 2), centers
+
+
+def grouped_bars(ax, values, group_labels=None, series_labels=None, width=.8, colors=None):
+    """Draw an ``(n_series, n_groups)`` array as grouped bars in one collection.
+
+    All rectangles are built in a single vectorised step and added as one
+    ``PolyCollection``, so the artist count does not grow with the number of
+    bars. Returns the collection.
+    """
+    import matplotlib
+    from matplotlib.collections import PolyCollection
+    from matplotlib.patches import Patch
+
+    n_series, n_groups = np.shape(values)
+    corners, centers = grouped_bar_corners(values, width)
+    if colors is None:
+        cycle = matplotlib.rcParams['axes.prop_cycle'].by_key()['color']
+        colors = [cycle[i % len(cycle)] for i in range(n_series)]
+    facecolors = np.repeat(matplotlib.colors.to_rgba_array(colors), n_groups, axis=0)
+    bars = PolyCollection(corners, facecolors=facecolors, linewidths=0)
+    bars.sticky_edges.y.append(0)
+    ax.add_collection(bars)
+    ax.autoscale_view()
+
+    if group_labels is not None:
+        ax.set_xticks(centers.mean(axis=0))
+        ax.set_xticklabels(group_labels)
+    if series_labels is not None:
+        ax.legend([Patch(facecolor=color) for color in colors], series_labels)
+    return bars
+
+
+def revenue_earnings_chart(fig, labels, revenue, earnings, width=.8, name='Netflix'):
+    """The notebook's Step 7 chart: revenue and earnings bars side by side."""
+    ax = fig.add_subplot()
+    grouped_bars(ax, [revenue, earnings], labels, ['Revenue', 'Earnings'], width)
+    ax.set_title(f'{name} Revenue and Earnings in $ Billions')
+    return fig
+
+
+def comparison_chart(fig, netflix, dowjones, names=('Netflix', 'Dow Jones')):
+    """The notebook's Step 8 chart: Netflix and the Dow side by side.
+
+    Both frames are Date-indexed with a ``Price`` column, as returned by
+    :func:`stock_profile.data.load_prices`. ``names`` titles the two panels.
+    Long series are reduced to the panels' pixel width before plotting.
+    """
+    ax1 = fig.add_subplot(1, 2, 1)
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Price')
+    ax1.set_title(names[0])
+    plot_downsampled(ax1, netflix.index, netflix['Price'].to_numpy())
+    ax1.tick_params(axis='x', labelrotation=90)
+
+    ax2 = fig.add_subplot(1, 2, 2)
+    ax2.set_xlabel('Date')
+    ax2.set_ylabel('Stock Price')
+    ax2.set_title(names[1])
+    plot_downsampled(ax2, dowjones.index, dowjones['Price'].to_numpy(), color='Red')
+    ax2.tick_params(axis='x', labelrotation=90)
+    fig.subplots_adjust(wspace=.5)
+    return fig
@@ -0,0 +1,169 @@
+"""Loading the Yahoo Finance CSVs used by the Stock Profile charts.
+
+Parsing text is the slow part of every run, so each CSV is parsed with
+pyarrow's multithreaded reader when it is installed and converted once
+into a Parquet cache next to it. Cache files are keyed by the CSV's path,
+size and modification time; when the CSV changes the key changes too and
+the cache is rebuilt on the next load.
+"""
+import contextlib
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from stock_profile import trace
+
+# Yahoo calls the split/dividend adjusted close "Adj Close"; the charts call it "Price".
+PRICE_COLUMNS = {'Adj Close': 'Price'}
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close', 'Price']
+
+CACHE_DIR = '.stock_cache'
+
+
+def csv_engine():
+    """``read_csv`` engine to parse with: pyarrow's multithreaded reader when installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'c'
+    return 'pyarrow'
+
+
+def _parse_csv(path):
+    with trace.stage('parse_csv', path=path) as span:
+        frame = pd.read_csv(path, parse_dates=['Date'], engine=csv_engine())
+        span.set(rows=len(frame))
+    with trace.stage('transform', path=path, step='rename'):
+        return frame.rename(columns=PRICE_COLUMNS)
+
+
+def _cache_key(path):
+    stat = os.stat(path)
+    raw = f'{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}'
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def cache_path(path, cache_dir=None):
+    """Where the Parquet cache for ``path`` lives for its current contents."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}-{_cache_key(path)}.parquet')
+
+
+def _drop_stale(cache_file):
+    # Older caches of the same CSV share the stem but not the key.
+    cache_dir = os.path.dirname(cache_file)
+    stem = os.path.basename(cache_file).rsplit('-', 1)[0]
+    for name in os.listdir(cache_dir):
+        other = os.path.join(cache_dir, name)
+        if name.endswith('.parquet') and name.rsplit('-', 1)[0] == stem and other != cache_file:
+            # A process rebuilding the same CSV's cache may have removed it already.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(other)
+
+
+def read_prices(path, cache_dir=None, use_cache=True):
+    """Load a Yahoo price CSV with ``Date`` parsed and ``Adj Close`` renamed to ``Price``.
+
+    The first load writes a Parquet copy; later loads read that copy instead
+    of the CSV. Without pyarrow installed, or when the copy cannot be
+    written, the CSV is simply parsed each time.
+    """
+    if not use_cache:
+        return _parse_csv(path)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return _parse_csv(path)
+
+    cache_file = cache_path(path, cache_dir)
+    if os.path.exists(cache_file):
+        with trace.stage('read_cache', path=path) as span:
+            frame = pd.read_parquet(cache_file)
+            span.set(rows=len(frame))
+        return frame
+
+    frame = _parse_csv(path)
+    tmp_file = f'{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        frame.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        # A read-only or full disk only costs the cache, not the load.
+        with contextlib.suppress(OSError):
+            os.remove(tmp_file)
+        return frame
+    _drop_stale(cache_file)
+    return frame
+
+
+def load_prices(path, price_dtype='float64', cache_dir=None, use_cache=True):
+    """Load a price CSV with pinned dtypes and a sorted ``Date`` index.
+
+    Prices (``Open`` ... ``Price``) are stored as ``price_dtype`` (float32
+    halves their footprint), ``Volume`` as int64 and ``Quarter``, when the
+    file has one, as a Categorical. Rows that are entirely ``null`` are dropped.
+    """
+    with trace.stage('load', path=path) as span:
+        frame = read_prices(path, cache_dir=cache_dir, use_cache=use_cache)
+        with trace.stage('transform', path=path, step='dtypes'):
+            frame = tidy_prices(frame, price_dtype)
+        span.set(rows=len(frame))
+    return frame
+
+
+def tidy_prices(frame, price_dtype='float64'):
+    """Index a parsed price table by sorted ``Date`` and pin its dtypes as
+    :func:`load_prices` does.
+
+    Yahoo's all-``null`` rows (market holidays, suspended trading) are
+    dropped; if ``Volume`` still has gaps it is the nullable ``Int64``.
+    """
+    values = [name for name in PRICE_FIELDS + ['Volume'] if name in frame]
+    if values:
+        frame = frame.dropna(how='all', subset=values)
+    frame = frame.set_index('Date').sort_index()
+    dtypes = {name: price_dtype for name in PRICE_FIELDS if name in frame}
+    if 'Volume' in frame:
+        dtypes['Volume'] = 'Int64' if frame['Volume'].isna().any() else 'int64'
+    if 'Quarter' in frame:
+        dtypes['Quarter'] = 'category'
+    return frame.astype(dtypes)
+
+
+def memory_report(path):
+    """Compare the in-memory size of ``path`` loaded by ``read_csv`` and ``load_prices``.
+
+    Returns a DataFrame with one row per loading mode and the total bytes,
+    bytes per row and size relative to plain ``pd.read_csv``.
+    """
+    modes = {
+        'read_csv': pd.read_csv(path),
+        'load_prices float64': load_prices(path, 'float64', use_cache=False),
+        'load_prices float32': load_prices(path, 'float32', use_cache=False),
+    }
+    rows = []
+    for mode, frame in modes.items():
+        total = int(frame.memory_usage(index=True, deep=True).sum())
+        rows.append({'mode': mode, 'bytes': total, 'bytes_per_row': total / max(len(frame), 1)})
+    report = pd.DataFrame(rows).set_index('mode')
+    report['relative'] = report['bytes'] / report.loc['read_csv', 'bytes']
+    return report
+
+
+# Netflix's reported quarterly figures used by the EPS and revenue charts.
+NETFLIX_EPS_2017 = {
+    'labels': ['1Q2017', '2Q2017', '3Q2017', '4Q2017'],
+    'actual': [.4, .15, .29, .41],
+    'estimate': [.37, .15, .32, .41],
+}
+# Revenue and earnings in billions of dollars.
+NETFLIX_REVENUE_2017 = {
+    'labels': ['2Q2017', '3Q2017', '4Q2017', '1Q2018'],
+    'revenue': [2.79, 2.98, 3.29, 3.7],
+    'earnings': [.0656, .12959, .18552, .29012],
+}
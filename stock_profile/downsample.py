@@ -0,0 +1,98 @@
+"""Reduce long price series to about one point per pixel before plotting.
+
+Two reducers, both vectorised in NumPy:
+
+* :func:`minmax` keeps the first, lowest, highest and last point of every
+  pixel-wide bucket, so the drawn envelope is identical to the full series.
+* :func:`lttb` (Largest-Triangle-Three-Buckets) keeps one point per bucket,
+  the one forming the largest triangle with its neighbours, which preserves
+  the visual shape with fewer vertices.
+
+x values may be datetimes; they are reduced as int64 and returned as given.
+"""
+import numpy as np
+
+
+def _as_numeric(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.view('int64').astype('float64')
+    return x.astype('float64')
+
+
+def _bucket_edges(n, n_buckets):
+    return np.linspace(0, n, n_buckets + 1).astype('intp')
+
+
+def minmax(x, y, n_buckets):
+    """Keep the first, lowest, highest and last point of each of ``n_buckets`` buckets.
+
+    Returns the reduced ``(x, y)``, at most ``4 * n_buckets`` points in order.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n <= 4 * n_buckets:
+        return x, y
+    edges = _bucket_edges(n, n_buckets)
+    starts, ends = edges[:-1], edges[1:]
+    size = ends - starts
+    # Pad every bucket to the largest bucket size so argmin/argmax run on a 2-D view.
+    width = size.max()
+    index = starts[:, None] + np.arange(width)[None, :]
+    valid = index < ends[:, None]
+    index = np.where(valid, index, ends[:, None] - 1)
+    values = y[index]
+    lows = index[np.arange(n_buckets), np.argmin(values, axis=1)]
+    highs = index[np.arange(n_buckets), np.argmax(values, axis=1)]
+    keep = np.unique(np.concatenate([starts, ends - 1, lows, highs]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling of ``(x, y)`` to ``n_out`` points.
+
+    The first and last points are always kept. The scan over buckets is
+    sequential by nature (each pick depends on the previous one), but each
+    bucket's triangle areas are computed as one array operation.
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    xs, ys = _as_numeric(x), np.asarray(y, dtype='float64')
+    edges = 1 + _bucket_edges(n - 2, n_out - 2)
+    # Mean point of every bucket, used as the third triangle vertex.
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(xs[1:-1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(ys[1:-1], edges[:-1] - 1) / counts
+    mean_x = np.r_[mean_x, xs[-1]]
+    mean_y = np.r_[mean_y, ys[-1]]
+
+    keep = np.empty(n_out, dtype='intp')
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = xs[previous], ys[previous]
+        cx, cy = mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((ax - cx) * (ys[start:end] - ay) - (ax - xs[start:end]) * (cy - ay))
+        previous = start + int(np.argmax(area))
+        keep[i + 1] = previous
+    return x[keep], y[keep]
+
+
+def axes_pixel_width(ax):
+    """Width of ``ax`` in device pixels, the natural bucket count for a line."""
+    return max(int(ax.get_window_extent().width), 1)
+
+
+def plot_downsampled(ax, x, y, method='minmax', **kwargs):
+    """``ax.plot(x, y)`` after reducing the series to the axes' pixel width."""
+    width = axes_pixel_width(ax)
+    if method == 'minmax':
+        x, y = minmax(x, y, width)
+    elif method == 'lttb':
+        x, y = lttb(x, y, 2 * width)
+    else:
+        raise ValueError(f"method must be 'minmax' or 'lttb', not {method!r}")
+    return ax.plot(x, y, **kwargs)
@@ -0,0 +1,56 @@
+"""Actual vs consensus earnings per share, for any number of tickers and quarters.
+
+Earnings are one long table with a row per (``Ticker``, ``Quarter``) and the
+reported ``Actual`` and consensus ``Estimate`` EPS. Surprise columns are
+computed for the whole table at once, so screening a full earnings season is
+a handful of array operations rather than a loop over names.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+EARNINGS_COLUMNS = ['Ticker', 'Quarter', 'Actual', 'Estimate']
+
+
+def read_earnings(path):
+    """Load an earnings table from Parquet (or CSV, by extension)."""
+    if os.path.splitext(path)[1].lower() == '.csv':
+        frame = pd.read_csv(path)
+    else:
+        frame = pd.read_parquet(path)
+    missing = set(EARNINGS_COLUMNS) - set(frame.columns)
+    if missing:
+        raise ValueError(f'{path} is missing earnings columns: {sorted(missing)}')
+    return frame.astype({'Ticker': 'category', 'Quarter': 'category',
+                         'Actual': 'float64', 'Estimate': 'float64'})
+
+
+def earnings_frame(ticker, labels, actual, estimate):
+    """An earnings table for one ticker from per-quarter lists,
+    e.g. ``earnings_frame('NFLX', **NETFLIX_EPS_2017)``."""
+    return pd.DataFrame({'Ticker': ticker, 'Quarter': labels, 'Actual': actual, 'Estimate': estimate})
+
+
+def surprises(frame):
+    """Add ``Surprise``, ``Surprise %``, ``Beat`` and ``Miss`` columns.
+
+    ``Surprise %`` is relative to the magnitude of the estimate and is NaN
+    where the estimate is zero.
+    """
+    actual = frame['Actual'].to_numpy(dtype='float64')
+    estimate = frame['Estimate'].to_numpy(dtype='float64')
+    surprise = actual - estimate
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = np.where(estimate != 0, surprise / np.abs(estimate) * 100, np.nan)
+    return frame.assign(**{'Surprise': surprise, 'Surprise %': percent,
+                           'Beat': surprise > 0, 'Miss': surprise < 0})
+
+
+def surprise_screen(frame, quarter=None, min_abs_percent=5.0):
+    """Rows whose absolute surprise is at least ``min_abs_percent``, largest first."""
+    frame = surprises(frame) if 'Surprise %' not in frame else frame
+    if quarter is not None:
+        frame = frame[frame['Quarter'] == quarter]
+    big = frame[frame['Surprise %'].abs() >= min_abs_percent]
+    return big.iloc[np.argsort(-big['Surprise %'].abs().to_numpy(), kind='stable')]
@@ -0,0 +1,99 @@
+"""Sorted date index with precomputed month and quarter offsets.
+
+A :class:`PriceIndex` answers "rows for Q3 2017" with a dict lookup in a
+table of period offsets and "2015-01-01..2017-06-30" with two binary
+searches. Both return a ``slice``, so selecting the rows of a NumPy array or
+a memory-mapped store column is a view rather than a boolean-mask copy.
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def _period_offsets(dates, freq):
+    periods = pd.DatetimeIndex(dates).to_period(freq)
+    codes = periods.asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(codes)]
+    return {periods[start]: slice(int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+
+def _date_only(when):
+    # '2017-06-30', datetime.date(2017, 6, 30) or datetime64[D]: a whole day, not its midnight.
+    if isinstance(when, str):
+        return ':' not in when and pd.Timestamp(when) == pd.Timestamp(when).normalize()
+    if isinstance(when, np.datetime64):
+        return np.datetime_data(when.dtype)[0] in ('Y', 'M', 'W', 'D')
+    return isinstance(when, datetime.date) and not isinstance(when, datetime.datetime)
+
+
+class PriceIndex:
+    """Row offsets of a sorted datetime index, by date window, month and quarter."""
+
+    def __init__(self, dates):
+        dates = pd.DatetimeIndex(dates)
+        if not dates.is_monotonic_increasing:
+            raise ValueError('PriceIndex needs dates sorted in increasing order')
+        self.dates = dates
+        self._values = dates.asi8
+        self._unit = np.datetime_data(dates.dtype)[0]
+        self._quarters = _period_offsets(dates, 'Q')
+        self._months = _period_offsets(dates, 'M')
+
+    def __len__(self):
+        return len(self._values)
+
+    def _position(self, when, side):
+        stamp = np.datetime64(pd.Timestamp(when), self._unit).astype('int64')
+        return int(np.searchsorted(self._values, stamp, side=side))
+
+    def window(self, start=None, end=None):
+        """Rows dated from ``start`` to ``end``, both inclusive; ``None`` leaves a side open.
+
+        An ``end`` without a time of day, such as '2017-06-30', takes in
+        every row on that day, so intraday bars up to its last minute count.
+        """
+        i = 0 if start is None else self._position(start, 'left')
+        if end is None:
+            j = len(self)
+        elif _date_only(end):
+            j = self._position(pd.Timestamp(end) + pd.Timedelta(days=1), 'left')
+        else:
+            j = self._position(end, 'right')
+        return slice(i, max(i, j))
+
+    def quarter(self, year, quarter):
+        """Rows in calendar quarter ``quarter`` (1-4) of ``year``; empty if none."""
+        return self._quarters.get(pd.Period(year=year, quarter=quarter, freq='Q'), slice(0, 0))
+
+    def month(self, year, month):
+        """Rows in ``month`` (1-12) of ``year``; empty if none."""
+        return self._months.get(pd.Period(year=year, month=month, freq='M'), slice(0, 0))
+
+    def quarters(self):
+        """``{pandas.Period: slice}`` for every quarter present, in date order."""
+        return dict(self._quarters)
+
+    def months(self):
+        """``{pandas.Period: slice}`` for every month present, in date order."""
+        return dict(self._months)
+
+
+class TickerIndex:
+    """One :class:`PriceIndex` per ticker over Date-indexed frames, built on first use."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self._indexes = {}
+
+    def index(self, ticker):
+        if ticker not in self._indexes:
+            self._indexes[ticker] = PriceIndex(self.frames[ticker].index)
+        return self._indexes[ticker]
+
+    def window(self, ticker, start=None, end=None):
+        return self.frames[ticker].iloc[self.index(ticker).window(start, end)]
+
+    def quarter(self, ticker, year, quarter):
+        return self.frames[ticker].iloc[self.index(ticker).quarter(year, quarter)]
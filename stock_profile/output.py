@@ -0,0 +1,143 @@
+"""Writing rendered charts without blocking the code that builds them.
+
+``fig.savefig('chart.png')`` rasterises the figure, compresses the pixels
+and writes the file, all on the calling thread. :class:`OutputStage` splits
+that in two: :meth:`OutputStage.save` rasterises the figure to an RGBA
+array exactly once (``bbox_inches='tight'`` is resolved by a layout-only
+pass, as savefig does), and PNG encoding plus the disk write run on a
+background thread pool. Pillow's zlib releases the GIL, so the next figure
+is built while earlier ones compress.
+
+At most ``max_pending`` images wait in the pool; :meth:`OutputStage.save`
+blocks until one finishes rather than letting rasters pile up in memory.
+With ``archive='charts.zip'`` every chart goes into one zip file instead of
+its own PNG::
+
+    with OutputStage('charts', compress_level=1) as output:
+        for ticker in tickers:
+            output.save(build(ticker), f'{ticker}.png', dpi=300, bbox_inches='tight')
+"""
+import io
+import os
+import threading
+import zipfile
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from stock_profile import trace
+
+
+class _Capture(io.RawIOBase):
+    # savefig(format='rgba') writes the renderer's (height, width, 4) buffer in one call.
+    rgba = None
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.rgba = np.array(data, dtype='uint8')
+        return self.rgba.nbytes
+
+
+def render_rgba(fig, dpi=None, **save_options):
+    """Rasterise ``fig`` once; returns ``(rgba, dpi)`` with ``rgba`` shaped (height, width, 4).
+
+    ``save_options`` are savefig's, e.g. ``bbox_inches='tight'``.
+    """
+    import matplotlib
+
+    dpi = dpi or matplotlib.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = fig.dpi
+    capture = _Capture()
+    fig.savefig(capture, format='rgba', dpi=dpi, **save_options)
+    return capture.rgba, dpi
+
+
+def encode_png(rgba, dpi=100, compress_level=6):
+    """PNG bytes for an RGBA array, with the same metadata savefig writes.
+
+    ``compress_level`` runs from 0 (no compression, fastest) to 9
+    (smallest); 6 is what savefig uses.
+    """
+    import matplotlib
+    from PIL import Image, PngImagePlugin
+
+    info = PngImagePlugin.PngInfo()
+    info.add_text('Software', f'Matplotlib version{matplotlib.__version__}, https://matplotlib.org/')
+    buffer = io.BytesIO()
+    Image.fromarray(rgba, 'RGBA').save(buffer, 'png', pnginfo=info, dpi=(dpi, dpi),
+                                       compress_level=compress_level)
+    return buffer.getvalue()
+
+
+class OutputStage:
+    """Encode and write rendered charts on a bounded background thread pool.
+
+    Use as a context manager, or call :meth:`close` to wait for every
+    pending write. Errors from the background threads are raised by the
+    next :meth:`save`/:meth:`write` call or by :meth:`close`.
+    """
+
+    def __init__(self, out_dir='.', archive=None, compress_level=6, workers=2, max_pending=None):
+        self.out_dir = out_dir
+        self.compress_level = compress_level
+        self.max_pending = max_pending or 2 * workers
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix='png')
+        self._pending = set()
+        self._archive = None
+        os.makedirs(out_dir, exist_ok=True)
+        if archive is not None:
+            self._archive = zipfile.ZipFile(os.path.join(out_dir, archive), 'w', zipfile.ZIP_STORED)
+            self._archive_lock = threading.Lock()
+
+    def save(self, fig, filename, dpi=None, **save_options):
+        """Rasterise ``fig`` now and queue it to be written as ``filename``.
+
+        Returns the PNG's path, or its member name in archive mode. The
+        figure may be changed or reused as soon as this returns.
+        """
+        with trace.stage('rasterize', path=filename):
+            rgba, dpi = render_rgba(fig, dpi, **save_options)
+        return self.write(rgba, filename, dpi)
+
+    def write(self, rgba, filename, dpi=100):
+        """Queue an RGBA array from :func:`render_rgba` to be written as ``filename``."""
+        while len(self._pending) >= self.max_pending:
+            self._reap(FIRST_COMPLETED)
+        self._pending.add(self._pool.submit(self._encode_and_write, rgba, filename, dpi))
+        return filename if self._archive is not None else os.path.join(self.out_dir, filename)
+
+    def _encode_and_write(self, rgba, filename, dpi):
+        with trace.stage('encode_png', path=filename, level=self.compress_level) as span:
+            png = encode_png(rgba, dpi, self.compress_level)
+            span.set(bytes=len(png))
+        with trace.stage('write_png', path=filename):
+            if self._archive is not None:
+                with self._archive_lock:
+                    self._archive.writestr(filename, png)
+            else:
+                with open(os.path.join(self.out_dir, filename), 'wb') as f:
+                    f.write(png)
+
+    def _reap(self, return_when):
+        finished, self._pending = wait(self._pending, return_when=return_when)
+        for future in finished:
+            future.result()
+
+    def close(self):
+        """Wait for every queued chart to be written and release the threads."""
+        try:
+            self._reap(ALL_COMPLETED)
+        finally:
+            self._pool.shutdown()
+            if self._archive is not None:
+                self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
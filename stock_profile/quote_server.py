@@ -0,0 +1,132 @@
+"""A local stand-in for a Yahoo-style quote service.
+
+    python -m stock_profile.quote_server --port 8060
+    python -m stock_profile.quote_server --data-dir . --latency-ms 50 --fail-rate 0.05
+
+Answers ``GET /v1/prices?symbols=NFLX,DJI&start=2017-01-01&end=2017-12-31``
+with one CSV holding every requested symbol's daily bars: a ``Ticker``
+column followed by Yahoo's ``Date,Open,High,Low,Close,Adj Close,Volume``.
+With ``--data-dir`` the bars come from ``<SYMBOL>.csv`` files there;
+otherwise every symbol gets a reproducible random walk seeded by its name,
+so thousands of tickers can be requested without any data on disk.
+Unknown symbols are left out of the response.
+
+``--latency-ms`` delays every response and ``--fail-rate`` answers that
+share of requests with ``503 Service Unavailable``, to exercise the
+pooling and retries of :class:`stock_profile.sources.HttpSource`.
+"""
+import argparse
+import functools
+import os
+import random
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+YAHOO_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+@functools.lru_cache(maxsize=16)
+def _business_days(end):
+    return pd.bdate_range('2000-01-03', end)
+
+
+def synthetic_bars(symbol, start='2017-01-01', end='2017-12-31'):
+    """Business-day bars for ``symbol``; the same symbol always gets the same walk."""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    dates = _business_days(pd.Timestamp(end))
+    close = rng.uniform(10, 500) * np.exp(np.cumsum(rng.normal(0, .015, len(dates))))
+    volume = rng.integers(100_000, 50_000_000, len(dates))
+    keep = slice(dates.searchsorted(pd.Timestamp(start)), None)
+    close = close[keep]
+    return pd.DataFrame({
+        'Date': dates[keep], 'Open': close * .995, 'High': close * 1.01, 'Low': close * .99,
+        'Close': close, 'Adj Close': close, 'Volume': volume[keep],
+    })
+
+
+class QuoteHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _bars(self, symbol, start, end):
+        data_dir = self.server.data_dir
+        if data_dir is None:
+            return synthetic_bars(symbol, start, end)
+        path = os.path.join(data_dir, f'{symbol}.csv')
+        if not os.path.exists(path):
+            return None
+        frame = pd.read_csv(path, parse_dates=['Date'], usecols=YAHOO_COLUMNS)
+        return frame[(frame['Date'] >= pd.Timestamp(start)) & (frame['Date'] <= pd.Timestamp(end))]
+
+    def _send(self, status, body, content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.latency)
+        url = urlsplit(self.path)
+        if url.path != '/v1/prices':
+            return self._send(404, b'no such endpoint\n')
+        if random.random() < self.server.fail_rate:
+            return self._send(503, b'try again\n')
+        query = parse_qs(url.query)
+        symbols = [s for s in query.get('symbols', [''])[0].split(',') if s]
+        if not symbols:
+            return self._send(400, b'missing symbols\n')
+        start = query.get('start', ['2017-01-01'])[0]
+        end = query.get('end', ['2017-12-31'])[0]
+        frames = []
+        for symbol in symbols:
+            bars = self._bars(symbol, start, end)
+            if bars is not None:
+                frames.append(bars.assign(Ticker=symbol)[['Ticker'] + YAHOO_COLUMNS])
+        table = pd.concat(frames) if frames else pd.DataFrame(columns=['Ticker'] + YAHOO_COLUMNS)
+        self._send(200, table.to_csv(index=False, date_format='%Y-%m-%d').encode(), 'text/csv')
+
+
+def make_server(host='127.0.0.1', port=8060, data_dir=None, latency=0.0, fail_rate=0.0):
+    """A ``ThreadingHTTPServer`` for the quote service; call ``serve_forever()`` on it.
+
+    ``port=0`` picks a free port, readable from ``server.server_address``.
+    """
+    server = ThreadingHTTPServer((host, port), QuoteHandler)
+    server.daemon_threads = True
+    server.data_dir = data_dir
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.requests = 0
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve Yahoo-style daily price CSVs for local testing.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8060)
+    parser.add_argument('--data-dir', help='serve <SYMBOL>.csv files from here instead of random walks')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every response')
+    parser.add_argument('--fail-rate', type=float, default=0, help='share of requests answered with 503')
+    args = parser.parse_args(argv)
+    server = make_server(args.host, args.port, args.data_dir, args.latency_ms / 1000, args.fail_rate)
+    host, port = server.server_address[:2]
+    print(f'serving on http://{host}:{port}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
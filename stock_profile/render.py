@@ -0,0 +1,168 @@
+"""Headless rendering of every Stock Profile chart.
+
+    python -m stock_profile.render --data-dir . --out-dir charts
+
+Each chart is built in its own worker process on a fresh ``Figure`` with
+the Agg canvas. Nothing goes through pyplot, so charts share no global
+figure state and a chart can never be saved blank after ``plt.show()``.
+Workers hand back raw RGBA pixels; PNG encoding and writing happen on the
+parent's :class:`~stock_profile.output.OutputStage` threads while other
+charts are still being drawn. ``--archive charts.zip`` collects every chart
+in one zip file.
+
+The quarterly charts (distribution, EPS, revenue/earnings) read a
+:mod:`stock_profile.summary` table kept under ``.stock_cache/`` (the data
+directory may be read-only), rebuilt first whenever the daily CSV is newer.
+``--history minute.csv`` instead renders one violin per year+quarter of a
+multi-year file, aggregated out of core across the worker processes.
+"""
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from stock_profile import charts, summary, trace
+from stock_profile.data import CACHE_DIR, NETFLIX_EPS_2017, NETFLIX_REVENUE_2017, load_prices
+from stock_profile.output import OutputStage, render_rgba
+from stock_profile.streaming import parallel_quarterly
+
+HISTORY_FILE = 'quarterlyDistributionHistory.png'
+
+
+def _new_figure():
+    # Imported here so that importing this module (e.g. for CHARTS) stays cheap.
+    from matplotlib.figure import Figure
+
+    return Figure()
+
+
+def summary_path(data_dir='.'):
+    """Where the NFLX summary table for the CSVs in ``data_dir`` is kept."""
+    key = hashlib.sha1(os.path.abspath(data_dir).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f'quarterly_summary-{key}.parquet')
+
+
+def netflix_summary(data_dir='.'):
+    """Path of the NFLX summary table for ``data_dir``, rebuilt when the daily CSV changes."""
+    path = summary_path(data_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return summary.ensure_summary(
+        path, {'NFLX': os.path.join(data_dir, 'NFLX_daily_by_quarter.csv')},
+        [summary.fundamentals_frame('NFLX', NETFLIX_EPS_2017, NETFLIX_REVENUE_2017)])
+
+
+def _rows(data_dir, columns=None):
+    return summary.read_summary(summary_path(data_dir), ['NFLX'], columns)
+
+
+def _distribution(data_dir):
+    return charts.distribution_chart, (summary.aggregates(_rows(data_dir)),)
+
+
+def _eps(data_dir):
+    return charts.eps_chart, (summary.earnings(_rows(data_dir, ['eps_actual', 'eps_estimate'])),)
+
+
+def _revenue(data_dir):
+    return charts.revenue_earnings_chart, summary.revenue(_rows(data_dir, ['revenue', 'earnings']))
+
+
+def _comparison(data_dir):
+    return charts.comparison_chart, (load_prices(os.path.join(data_dir, 'NFLX.csv')),
+                                     load_prices(os.path.join(data_dir, 'DJI.csv')))
+
+
+# name: (input loader, output file, savefig keyword arguments)
+CHARTS = {
+    'distribution': (_distribution, 'quarterlyDistribution2017.png', {}),
+    'eps': (_eps, 'earningsPerShare2017.png', {}),
+    'revenue': (_revenue, 'revenue&earning.png', {}),
+    'comparison': (_comparison, 'netflix_chart11.png', {'dpi': 100, 'bbox_inches': 'tight'}),
+}
+
+
+def build_chart(name, data_dir='.'):
+    """Chart ``name`` drawn from the CSVs in ``data_dir``, as a new ``Figure``."""
+    load, _, _ = CHARTS[name]
+    with trace.stage('figure', chart=name):
+        build, inputs = load(data_dir)
+        return build(_new_figure(), *inputs)
+
+
+def render_chart(name, data_dir='.', out_dir='.'):
+    """Build chart ``name`` from the CSVs in ``data_dir`` and save it to ``out_dir``."""
+    _, filename, save_options = CHARTS[name]
+    netflix_summary(data_dir)
+    fig = build_chart(name, data_dir)
+    path = os.path.join(out_dir, filename)
+    with trace.stage('savefig', chart=name, path=path):
+        fig.savefig(path, **save_options)
+    return path
+
+
+def _rasterize_chart(name, data_dir):
+    _, _, save_options = CHARTS[name]
+    fig = build_chart(name, data_dir)
+    with trace.stage('rasterize', chart=name):
+        return render_rgba(fig, **save_options)
+
+
+def render_all(data_dir='.', out_dir='.', names=None, workers=None, compress_level=6, archive=None):
+    """Render ``names`` (default: every chart) in a process pool, one chart per task.
+
+    ``compress_level`` (0-9) trades PNG size for encoding time; with
+    ``archive``, the PNGs are stored in that zip file inside ``out_dir``.
+    Returns ``{name: png_path}`` (zip member names in archive mode).
+    """
+    names = list(CHARTS) if names is None else names
+    netflix_summary(data_dir)
+    paths = {}
+    with OutputStage(out_dir, archive, compress_level) as output, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_rasterize_chart, name, data_dir): name for name in names}
+        for future in as_completed(futures):
+            name = futures[future]
+            rgba, dpi = future.result()
+            paths[name] = output.write(rgba, CHARTS[name][1], dpi)
+    return {name: paths[name] for name in names}
+
+
+def render_history(path, out_dir='.', name='Netflix', workers=None, filename=HISTORY_FILE):
+    """Render every year+quarter distribution of a long price CSV, aggregated out of core
+    by :func:`~stock_profile.streaming.parallel_quarterly`. Returns the PNG path."""
+    aggregates = parallel_quarterly(path, by='year', workers=workers)
+    with trace.stage('figure', chart='history'):
+        fig = charts.history_distribution_chart(_new_figure(), aggregates, name)
+    os.makedirs(out_dir, exist_ok=True)
+    out_path = os.path.join(out_dir, filename)
+    with trace.stage('savefig', chart='history', path=out_path):
+        fig.savefig(out_path, dpi=100, bbox_inches='tight')
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render the Stock Profile charts to PNG.')
+    parser.add_argument('--data-dir', default='.', help='directory holding the CSV files')
+    parser.add_argument('--out-dir', default='.', help='directory to write PNGs to')
+    parser.add_argument('--chart', action='append', choices=list(CHARTS), dest='names',
+                        help='chart to render (repeatable, default: all)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(10), metavar='0-9',
+                        help='PNG compression level (default: 6)')
+    parser.add_argument('--archive', metavar='ZIP', help='write every chart into this zip in --out-dir')
+    parser.add_argument('--history', metavar='CSV',
+                        help=f'only render {HISTORY_FILE}, every quarter of this multi-year price CSV')
+    parser.add_argument('--history-name', default='Netflix', help='name in the history chart title')
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+    with trace.from_arguments(args):
+        if args.history:
+            print(f'history: {render_history(args.history, args.out_dir, args.history_name, args.workers)}')
+            return
+        for name, path in render_all(args.data_dir, args.out_dir, args.names, args.workers,
+                                     args.compress_level, args.archive).items():
+            print(f'{name}: {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""Stock Profile chart sets for many tickers at once.
+
+    python -m stock_profile.reports --benchmark DJI.csv --out-dir reports \\
+        NFLX:NFLX.csv:NFLX_daily_by_quarter.csv AAPL:AAPL.csv:AAPL_daily.csv
+
+Every ticker gets its distribution (Q1-Q4 of the year its daily prices
+cover, or every year+quarter when they span several years), vs-benchmark
+and, when its figures are supplied, EPS and revenue/earnings charts in
+``<out-dir>/<ticker>/``. The benchmark series is loaded once in the parent
+and published in shared memory (:mod:`stock_profile.shared`); each worker
+attaches to it when it starts, so it is not re-read, re-sent or copied per
+worker or ticker. At most ``max_pending`` tickers are queued on the pool at
+any time, and each worker redraws into the same figures from
+:mod:`stock_profile.templates`. A worker's PNGs are encoded on background
+threads while it draws the next chart; ``--compress-level`` trades file
+size for encoding time. A ticker whose inputs fail to load or render is
+reported and skipped, and the command exits non-zero listing the failed
+tickers once the rest are done.
+
+With ``--summary quarterly_summary.parquet`` (see :mod:`stock_profile.summary`)
+the quarterly charts read each ticker's rows of that table instead of its
+daily CSV, which may then be left empty (``NFLX:NFLX.csv:``), and EPS and
+revenue figures found there are charted too.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from matplotlib.figure import Figure
+
+from stock_profile import charts, shared, summary, trace
+from stock_profile.data import load_prices
+from stock_profile.earnings import earnings_frame
+from stock_profile.output import OutputStage
+from stock_profile.streaming import stream_quarterly
+from stock_profile.templates import TemplatePool
+
+# ``eps`` and ``revenue`` are optional dicts shaped like
+# stock_profile.data.NETFLIX_EPS_2017 and NETFLIX_REVENUE_2017.
+TickerInputs = namedtuple('TickerInputs', 'ticker monthly daily eps revenue', defaults=(None, None))
+
+_benchmark = None
+_summary_path = None
+# Each worker reuses one figure per chart across the tickers it renders.
+_templates = TemplatePool()
+
+
+def _init_worker(benchmark_spec, benchmark_name, summary_path=None):
+    global _benchmark, _summary_path
+    _benchmark = (shared.attach(benchmark_spec), benchmark_name)
+    _summary_path = summary_path
+
+
+def _quarterly_inputs(inputs):
+    # (distribution aggregates keyed '2017Q1', earnings table or None, revenue triple or None)
+    eps = None if inputs.eps is None else earnings_frame(inputs.ticker, **inputs.eps)
+    revenue = None if inputs.revenue is None else (
+        inputs.revenue['labels'], inputs.revenue['revenue'], inputs.revenue['earnings'])
+    if _summary_path is None:
+        return stream_quarterly(inputs.daily, by='year'), eps, revenue
+    rows = summary.read_summary(_summary_path, [inputs.ticker])
+    if rows['eps_actual'].notna().any():
+        eps = summary.earnings(rows)
+    if rows['revenue'].notna().any():
+        revenue = summary.revenue(rows)
+    return summary.aggregates(rows, by_year=True), eps, revenue
+
+
+def _distribution(aggregates, name):
+    # One year's quarters go in the reusable Q1-Q4 figure, titled with that
+    # year; a longer history gets a violin per year+quarter.
+    years = sorted({label[:4] for label in aggregates})
+    if len(years) > 1:
+        return charts.history_distribution_chart(Figure(), aggregates, name)
+    quarters = {label[4:]: aggregate for label, aggregate in aggregates.items()}
+    return _templates.render('distribution', quarters, name=name, period=years[0] if years else '')
+
+
+def render_ticker(inputs, out_dir, compress_level=6):
+    """Render one ticker's chart set; returns ``(ticker, paths, seconds per chart)``.
+
+    Chart timings cover drawing and rasterising; the PNGs are all written
+    by the time this returns.
+    """
+    benchmark, benchmark_name = _benchmark
+    paths, timings = {}, {}
+    output = OutputStage(os.path.join(out_dir, inputs.ticker), compress_level=compress_level)
+
+    def timed(name, build, filename, **save_options):
+        start = time.perf_counter()
+        with trace.stage('figure', ticker=inputs.ticker, chart=name):
+            fig = build()
+        paths[name] = output.save(fig, filename, **save_options)
+        timings[name] = time.perf_counter() - start
+
+    with output:
+        aggregates, eps, revenue = _quarterly_inputs(inputs)
+        timed('distribution', lambda: _distribution(aggregates, inputs.ticker), 'quarterly_distribution.png')
+        timed('comparison', lambda: _templates.render(
+            'comparison', load_prices(inputs.monthly), benchmark, names=(inputs.ticker, benchmark_name)),
+            'vs_benchmark.png', dpi=100, bbox_inches='tight')
+        if eps is not None:
+            timed('eps', lambda: _templates.render('eps', eps), 'eps.png')
+        if revenue is not None:
+            timed('revenue', lambda: _templates.render('revenue', *revenue, name=inputs.ticker),
+                  'revenue_earnings.png')
+    return inputs.ticker, paths, timings
+
+
+def _print_progress(done, total, ticker, timings, error=None):
+    if error is not None:
+        print(f'[{done}/{total}] {ticker}: FAILED {type(error).__name__}: {error}')
+        return
+    detail = ', '.join(f'{name} {seconds:.2f}s' for name, seconds in timings.items())
+    print(f'[{done}/{total}] {ticker}: {sum(timings.values()):.2f}s ({detail})')
+
+
+def generate_reports(tickers, benchmark_path, out_dir='reports', benchmark_name='Dow Jones',
+                     workers=None, max_pending=None, progress=_print_progress, compress_level=6,
+                     summary_path=None):
+    """Render the chart set for every :class:`TickerInputs` in ``tickers``.
+
+    A ticker that fails (a missing or malformed CSV, say) does not stop
+    the batch. ``progress(done, total, ticker, timings, error)`` is called
+    as each ticker finishes, with ``error`` the exception for a failed
+    ticker and ``None`` otherwise; pass ``progress=None`` to stay quiet.
+    Returns ``(results, failures)``: ``{ticker: {chart: path}}`` and
+    ``{ticker: exception}``.
+    """
+    tickers = list(tickers)
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2 * workers
+    results, failures = {}, {}
+    with shared.publish(load_prices(benchmark_path)) as benchmark, \
+            ProcessPoolExecutor(workers, initializer=_init_worker,
+                                initargs=(benchmark.spec, benchmark_name, summary_path)) as pool:
+        queue = iter(tickers)
+        pending = {}
+        while True:
+            for inputs in queue:
+                pending[pool.submit(render_ticker, inputs, out_dir, compress_level)] = inputs.ticker
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                ticker = pending.pop(future)
+                timings, error = {}, future.exception()
+                if error is None:
+                    _, results[ticker], timings = future.result()
+                else:
+                    failures[ticker] = error
+                if progress is not None:
+                    progress(len(results) + len(failures), len(tickers), ticker, timings, error)
+    return results, failures
+
+
+def _parse_ticker(spec):
+    try:
+        ticker, monthly, daily = spec.split(':')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected TICKER:MONTHLY_CSV:DAILY_CSV, got {spec!r}') from None
+    return TickerInputs(ticker, monthly, daily)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render Stock Profile charts for many tickers.')
+    parser.add_argument('tickers', nargs='+', type=_parse_ticker, metavar='TICKER:MONTHLY_CSV:DAILY_CSV')
+    parser.add_argument('--benchmark', required=True, help='benchmark price CSV, e.g. DJI.csv')
+    parser.add_argument('--benchmark-name', default='Dow Jones')
+    parser.add_argument('--out-dir', default='reports')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='tickers queued on the pool at once (default: 2 x workers)')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(10), metavar='0-9',
+                        help='PNG compression level (default: 6)')
+    parser.add_argument('--summary', metavar='PARQUET', help='read quarterly charts from this summary table')
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+    with trace.from_arguments(args):
+        _, failures = generate_reports(args.tickers, args.benchmark, args.out_dir, args.benchmark_name,
+                                       args.workers, args.max_pending, compress_level=args.compress_level,
+                                       summary_path=args.summary)
+    if failures:
+        sys.exit(f'{len(failures)} of {len(args.tickers)} tickers failed: ' + ', '.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Weekly, monthly and quarterly bars derived from daily bars.
+
+The monthly ``NFLX.csv``/``DJI.csv`` files carry nothing the daily bars do
+not: each period's open is its first daily open, high the maximum high, low
+the minimum low, close (and adjusted ``Price``) the last close and volume the
+summed volume. :func:`resample_ohlcv` computes all of that in one pass with
+``ufunc.reduceat`` over the period boundaries, and :class:`ResampleCache`
+keeps recently used (ticker, frequency) results so they are built once.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stock_profile.streaming import quarter_labels
+
+FREQUENCIES = {'D': None, 'W': 'W', 'M': 'M', 'Q': 'Q'}
+
+
+def _period_starts(index, freq):
+    codes = index.to_period(freq).asi8
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def resample_ohlcv(daily, freq):
+    """Aggregate a Date-indexed, sorted daily frame to ``'W'``, ``'M'`` or ``'Q'`` bars.
+
+    Bars are labelled with the first calendar day of their period, like the
+    Yahoo monthly files. Columns that are present among Open, High, Low,
+    Close, Price and Volume are aggregated; others are dropped.
+    """
+    if FREQUENCIES.get(freq) is None:
+        raise ValueError(f'freq must be one of W, M or Q, not {freq!r}')
+    starts = _period_starts(daily.index, freq)
+    ends = np.r_[starts[1:], len(daily)] - 1
+    reducers = {
+        'Open': lambda v: v[starts],
+        'High': lambda v: np.maximum.reduceat(v, starts),
+        'Low': lambda v: np.minimum.reduceat(v, starts),
+        'Close': lambda v: v[ends],
+        'Price': lambda v: v[ends],
+        'Volume': lambda v: np.add.reduceat(v, starts),
+    }
+    index = daily.index[starts].to_period(freq).start_time.rename('Date')
+    # A nullable Int64 Volume (see load_prices) sums its gaps as zero.
+    columns = {name: daily[name].to_numpy('int64', na_value=0) if name == 'Volume' else daily[name].to_numpy()
+               for name in reducers if name in daily}
+    return pd.DataFrame({name: reducers[name](values) for name, values in columns.items()}, index=index)
+
+
+def with_quarter(frame):
+    """``frame`` with a Categorical ``Quarter`` column derived from its Date index."""
+    return frame.assign(Quarter=pd.Categorical(quarter_labels(frame.index)))
+
+
+class ResampleCache:
+    """LRU cache of resampled bars per (ticker, frequency).
+
+    ``load_daily(ticker)`` supplies the daily bars, e.g.
+    ``lambda t: load_prices(f'{t}_daily.csv')``; the daily frame itself is
+    cached under frequency ``'D'``.
+    """
+
+    def __init__(self, load_daily, maxsize=64):
+        self.load_daily = load_daily
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        value = build()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def bars(self, ticker, freq='M'):
+        """Bars for ``ticker`` at ``freq`` (``'D'``, ``'W'``, ``'M'`` or ``'Q'``)."""
+        if freq not in FREQUENCIES:
+            raise ValueError(f'freq must be one of {", ".join(FREQUENCIES)}, not {freq!r}')
+        daily = self._lookup((ticker, 'D'), lambda: self.load_daily(ticker))
+        if freq == 'D':
+            return daily
+        return self._lookup((ticker, freq), lambda: resample_ohlcv(daily, freq))
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,320 @@
+"""Chart data over HTTP for interactive pan and zoom.
+
+    python -m stock_profile.server --port 8050 NFLX=NFLX.csv DJI=DJI.csv
+
+Every price file is loaded once at startup; requests only slice the
+in-memory arrays through a :class:`~stock_profile.index.PriceIndex` and
+aggregate server side, so a response is about as large as the viewer's
+screen no matter how many years it spans:
+
+``GET /series?ticker=NFLX&start=2010-01-01&end=2017-12-31&width=800``
+    The price line reduced with :func:`~stock_profile.downsample.minmax` to
+    ``width`` pixel buckets, as ``{"x": [epoch ms, ...], "y": [...]}``. With
+    ``format=bin`` the body is the little-endian int64 ``x`` array followed
+    by the float64 ``y`` array, with the point count in ``X-Points``.
+``GET /distribution?ticker=NFLX&start=2017-01-01&end=2017-12-31``
+    Per-quarter violin curves and quartiles, as drawn by
+    :func:`~stock_profile.charts.draw_violins`.
+``GET /summary?ticker=NFLX&start=2015Q1&end=2017Q4&columns=p50,volatility``
+    Rows of the :mod:`stock_profile.summary` table given with ``--summary``,
+    as ``{"columns": [...], "rows": [[...], ...]}``; ``columns``, ``start``
+    and ``end`` are optional.
+``GET /stats``
+    Cache size, hits and misses.
+
+Before a ``/series`` or ``/distribution`` request is looked up, its window
+is widened to aligned tiles: a zoom level is picked from the window's
+length (a power of two days, about ``TILES_PER_VIEW`` tiles per view) and
+``start``/``end`` are rounded out to that level's tile boundaries, and
+``width`` is rounded up to a power of two. Views panned or zoomed a little
+therefore map to the same key, and the client trims the few extra points.
+Encoded responses are kept in an LRU cache keyed by that tiled request,
+and concurrent requests for the same uncached tiles share one computation,
+which runs on a thread so the event loop keeps serving cache hits.
+"""
+import argparse
+import asyncio
+import json
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from stock_profile.data import load_prices
+from stock_profile.downsample import minmax
+from stock_profile.index import PriceIndex
+from stock_profile.kde import binned_densities, histogram_quantiles, violin_curves
+from stock_profile.summary import FUNDAMENTAL_COLUMNS, PRICE_SUMMARY_COLUMNS, read_summary
+
+MAX_WIDTH = 10_000
+TILES_PER_VIEW = 8
+_EPOCH = pd.Timestamp('1970-01-01')
+
+
+class RequestError(ValueError):
+    """A bad request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ChartData:
+    """Price series for a set of tickers, sliced and aggregated per request.
+
+    Rows without a price (Yahoo's ``null`` days) are dropped up front.
+    """
+
+    def __init__(self, frames, summary_path=None):
+        self.summary_path = summary_path
+        self._dates = {}
+        self._prices = {}
+        self._indexes = {}
+        for ticker, frame in frames.items():
+            frame = frame[frame['Price'].notna()]
+            self._dates[ticker] = frame.index.to_numpy('datetime64[ms]').view('int64')
+            self._prices[ticker] = frame['Price'].to_numpy('float64')
+            self._indexes[ticker] = PriceIndex(frame.index)
+
+    @classmethod
+    def from_csvs(cls, paths, summary_path=None):
+        """``paths`` maps ticker to price CSV, read with :func:`~stock_profile.data.load_prices`."""
+        return cls({ticker: load_prices(path) for ticker, path in paths.items()}, summary_path)
+
+    @property
+    def tickers(self):
+        return list(self._prices)
+
+    def _window(self, ticker, start, end):
+        if ticker not in self._indexes:
+            raise RequestError(f'unknown ticker {ticker!r}', 404)
+        try:
+            return self._indexes[ticker].window(start, end)
+        except ValueError as exc:
+            raise RequestError(f'bad date: {exc}') from None
+
+    def series(self, ticker, start=None, end=None, width=800):
+        """``(x epoch ms, y)`` arrays for the window, at most ``4 * width`` points."""
+        rows = self._window(ticker, start, end)
+        return minmax(self._dates[ticker][rows], self._prices[ticker][rows], width)
+
+    def distribution(self, ticker, start=None, end=None):
+        """Violin curves and quartiles for every quarter in the window."""
+        rows = self._window(ticker, start, end)
+        labels, sizes = [], []
+        for period, quarter in self._indexes[ticker].quarters().items():
+            size = min(quarter.stop, rows.stop) - max(quarter.start, rows.start)
+            if size > 0:
+                labels.append(str(period))
+                sizes.append(size)
+        if not labels:
+            return {'ticker': ticker, 'quarters': [], 'grids': [], 'densities': [], 'quartiles': []}
+        codes = np.repeat(np.arange(len(labels)), sizes)
+        binned = binned_densities(self._prices[ticker][rows], codes, len(labels))
+        curves = violin_curves(binned)
+        quartiles = histogram_quantiles(binned['hist'], binned['grid'], [0.25, 0.5, 0.75])
+        return {'ticker': ticker, 'quarters': labels,
+                'grids': [grid.tolist() for grid, _ in curves],
+                'densities': [density.tolist() for _, density in curves],
+                'quartiles': quartiles.tolist()}
+
+    def summary(self, ticker, start=None, end=None, columns=None):
+        """Summary table rows for ``ticker``, JSON ready."""
+        if self.summary_path is None:
+            raise RequestError('no summary table loaded', 404)
+        unknown = set(columns or ()) - set(PRICE_SUMMARY_COLUMNS + FUNDAMENTAL_COLUMNS)
+        if unknown:
+            raise RequestError(f'unknown summary columns: {", ".join(sorted(unknown))}')
+        try:
+            rows = read_summary(self.summary_path, [ticker], columns, start, end)
+        except ValueError as exc:
+            raise RequestError(f'bad quarter: {exc}') from None
+        rows = rows.astype(object).where(rows.notna(), None)
+        return {'ticker': ticker, 'columns': list(rows.columns), 'rows': rows.to_numpy().tolist()}
+
+
+def _param(query, name, default=None):
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _tile_bounds(start, end):
+    # Round [start, end] out to the tiles of the zoom level the window's length picks.
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end)
+    tile = pd.Timedelta(days=1)
+    if start is not None and end is not None and end > start:
+        days = (end - start) / pd.Timedelta(days=1) / TILES_PER_VIEW
+        tile = pd.Timedelta(days=2 ** max(int(np.ceil(np.log2(max(days, 1)))), 0))
+    if start is not None:
+        start = _EPOCH + (start - _EPOCH) // tile * tile
+    if end is not None:
+        end = _EPOCH + ((end - _EPOCH) // tile + 1) * tile - pd.Timedelta(1, 'us')
+    return start, end
+
+
+def _tile_query(kind, query):
+    """``query`` with its window widened to aligned tiles, so nearby views share a cache key."""
+    query = {name: values[-1:] for name, values in query.items()}
+    if kind not in ('series', 'distribution'):
+        return query
+    try:
+        start, end = _tile_bounds(_param(query, 'start'), _param(query, 'end'))
+    except ValueError as exc:
+        raise RequestError(f'bad date: {exc}') from None
+    if start is not None:
+        query['start'] = [start.isoformat()]
+    if end is not None:
+        query['end'] = [end.isoformat()]
+    width = _param(query, 'width')
+    if width is not None and width.isdigit() and 1 <= int(width) <= MAX_WIDTH:
+        query['width'] = [str(min(1 << (int(width) - 1).bit_length(), MAX_WIDTH))]
+    return query
+
+
+def _encode(kind, data, query):
+    """Compute one response body; returns ``(content type, headers, body)``."""
+    ticker = _param(query, 'ticker')
+    if ticker is None:
+        raise RequestError('missing ticker')
+    start, end = _param(query, 'start'), _param(query, 'end')
+    if kind == 'distribution':
+        return 'application/json', {}, json.dumps(data.distribution(ticker, start, end)).encode()
+    if kind == 'summary':
+        columns = _param(query, 'columns')
+        columns = None if columns is None else columns.split(',')
+        return 'application/json', {}, json.dumps(data.summary(ticker, start, end, columns)).encode()
+    try:
+        width = int(_param(query, 'width', 800))
+    except ValueError:
+        raise RequestError('width must be an integer') from None
+    if not 1 <= width <= MAX_WIDTH:
+        raise RequestError(f'width must be between 1 and {MAX_WIDTH}')
+    x, y = data.series(ticker, start, end, width)
+    if _param(query, 'format', 'json') == 'bin':
+        body = x.astype('<i8').tobytes() + y.astype('<f8').tobytes()
+        return 'application/octet-stream', {'X-Points': str(len(x))}, body
+    return 'application/json', {}, json.dumps({'ticker': ticker, 'x': x.tolist(), 'y': y.tolist()}).encode()
+
+
+class ChartServer:
+    """asyncio HTTP/1.1 front end for a :class:`ChartData`, with an LRU response cache."""
+
+    def __init__(self, data, cache_size=1024):
+        self.data = data
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {'tickers': self.data.tickers, 'cached': len(self._cache), 'cache_size': self.cache_size,
+                'hits': self.hits, 'misses': self.misses}
+
+    async def respond(self, kind, query):
+        query = _tile_query(kind, query)
+        key = (kind,) + tuple(sorted((name, values[-1]) for name, values in query.items()))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        if key in self._in_flight:
+            self.hits += 1
+            return await asyncio.shield(self._in_flight[key])
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = self._in_flight[key] = loop.run_in_executor(None, _encode, kind, self.data, query)
+        try:
+            response = await future
+        finally:
+            del self._in_flight[key]
+        self._cache[key] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    async def _route(self, method, target):
+        if method != 'GET':
+            raise RequestError(f'method {method} not allowed', 405)
+        url = urlsplit(target)
+        if url.path == '/stats':
+            return 'application/json', {}, json.dumps(self.stats()).encode()
+        if url.path not in ('/series', '/distribution', '/summary'):
+            raise RequestError(f'no such endpoint {url.path!r}', 404)
+        return await self.respond(url.path[1:], parse_qs(url.query))
+
+    async def handle(self, reader, writer):
+        """Serve requests on one keep-alive connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                headers = {name.strip().lower(): value.strip()
+                           for name, _, value in (line.partition(':') for line in header_lines)}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                try:
+                    try:
+                        method, target, _ = request_line.split(' ', 2)
+                    except ValueError:
+                        raise RequestError('malformed request line') from None
+                    content_type, extra, body = await self._route(method, target)
+                    status = 200
+                except RequestError as exc:
+                    status, content_type, extra = exc.status, 'application/json', {}
+                    body = json.dumps({'error': str(exc)}).encode()
+                except Exception as exc:
+                    traceback.print_exc()
+                    status, content_type, extra = 500, 'application/json', {}
+                    body = json.dumps({'error': f'internal error: {type(exc).__name__}'}).encode()
+                lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}',
+                         f'Content-Type: {content_type}', f'Content-Length: {len(body)}',
+                         'Connection: ' + ('keep-alive' if keep_alive else 'close')]
+                lines += [f'{name}: {value}' for name, value in extra.items()]
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8050, ready=None):
+        """Serve until cancelled; ``ready(port)`` is called once the socket listens."""
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def _parse_source(spec):
+    ticker, sep, path = spec.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f'expected TICKER=CSV, got {spec!r}')
+    return ticker, path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve Stock Profile chart data over HTTP.')
+    parser.add_argument('sources', nargs='+', type=_parse_source, metavar='TICKER=CSV')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--cache-size', type=int, default=1024, help='responses kept in the LRU cache')
+    parser.add_argument('--summary', metavar='PARQUET', help='summary table for /summary')
+    args = parser.parse_args(argv)
+    server = ChartServer(ChartData.from_csvs(dict(args.sources), args.summary), args.cache_size)
+    try:
+        asyncio.run(server.serve(args.host, args.port,
+                                 ready=lambda port: print(f'serving on http://{args.host}:{port}', flush=True)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Hand price frames to worker processes through shared memory.
+
+    with shared.publish(prices) as published:
+        pool.submit(work, published.spec)    # a few hundred bytes, not the rows
+
+    def work(spec):
+        prices = shared.attach(spec)          # zero-copy views of the segment
+
+:func:`publish` copies a frame's index and columns once into one
+``multiprocessing.shared_memory`` segment and returns a
+:class:`SharedFrame` owning it. Its ``spec`` is a small picklable
+:class:`SharedSpec` (segment name, dtypes and offsets) that can go in task
+arguments or pool ``initargs``; :func:`attach` rebuilds the frame in a
+worker as NumPy views of the mapped segment, so no rows are pickled or
+copied however many workers read them. Numeric and datetime columns are
+shared as they are and Categoricals (``Quarter``) as their codes; other
+columns are refused.
+
+The publisher unlinks the segment when the ``with`` block ends, when the
+:class:`SharedFrame` is garbage collected, or at interpreter exit. If the
+publisher is killed, ``multiprocessing``'s resource tracker unlinks it
+once the publisher and its workers are gone, and the next :func:`publish`
+removes segments left behind by any dead publisher (e.g. when the tracker
+was killed too). Attach only from processes the publisher started, which
+share its resource tracker: on Python before 3.13 an unrelated process
+that attaches would unlink the segment when it exits.
+"""
+import os
+import secrets
+import weakref
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from stock_profile import trace
+
+PREFIX = 'stock_profile_'
+ALIGN = 64
+SHM_DIR = '/dev/shm'
+
+# ``index`` and every entry of ``columns`` are (name, dtype, offset, categories).
+SharedSpec = namedtuple('SharedSpec', 'segment rows index columns')
+
+# Segments this process has attached, kept mapped for its lifetime: the
+# frames handed out are views of them, and a mapping cannot be closed
+# while views exist.
+_attached = {}
+
+
+def _layout(arrays):
+    offsets, end = [], 0
+    for array in arrays:
+        end = -(-end // ALIGN) * ALIGN
+        offsets.append(end)
+        end += array.nbytes
+    return offsets, max(end, 1)
+
+
+def _raw(values, name):
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), tuple(values.cat.categories)
+    array = values.to_numpy()
+    if array.dtype.kind not in 'biufmM':
+        raise TypeError(f'cannot share column {name!r} of dtype {values.dtype}')
+    return np.ascontiguousarray(array), None
+
+
+def _unlink(segment):
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_stale_segments():
+    """Unlink segments left by publishers that are no longer running; returns their names."""
+    try:
+        names = os.listdir(SHM_DIR)
+    except FileNotFoundError:
+        return []
+    stale = []
+    for name in names:
+        pid = name[len(PREFIX):].partition('_')[0]
+        if name.startswith(PREFIX) and pid.isdigit() and not _alive(int(pid)):
+            try:
+                _unlink(shared_memory.SharedMemory(name))
+            except FileNotFoundError:
+                continue
+            stale.append(name)
+    return stale
+
+
+class SharedFrame:
+    """A published frame's segment; ``spec`` is what workers need to attach.
+
+    The creating process owns the segment. :meth:`close` (or leaving the
+    ``with`` block) unlinks it; frames workers already attached stay
+    readable until those workers exit.
+    """
+
+    def __init__(self, segment, spec):
+        self.spec = spec
+        self.nbytes = segment.size
+        self._segment = segment
+        self._finalizer = weakref.finalize(self, _unlink, segment)
+
+    @property
+    def name(self):
+        return self.spec.segment
+
+    def close(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def publish(frame):
+    """Copy ``frame``'s index and columns into a new shared segment; returns a :class:`SharedFrame`."""
+    remove_stale_segments()
+    index, index_categories = _raw(frame.index.to_series(), frame.index.name)
+    parts = [_raw(frame[name], name) for name in frame.columns]
+    arrays = [index] + [array for array, _ in parts]
+    offsets, size = _layout(arrays)
+    with trace.stage('publish', rows=len(frame), bytes=size):
+        segment = shared_memory.SharedMemory(f'{PREFIX}{os.getpid()}_{secrets.token_hex(6)}',
+                                             create=True, size=size)
+        for array, offset in zip(arrays, offsets):
+            np.ndarray(array.shape, array.dtype, segment.buf, offset)[:] = array
+    fields = [(frame.index.name, index.dtype.str, offsets[0], index_categories)]
+    fields += [(name, array.dtype.str, offset, categories)
+               for name, (array, categories), offset in zip(frame.columns, parts, offsets[1:])]
+    return SharedFrame(segment, SharedSpec(segment.name, len(frame), fields[0], tuple(fields[1:])))
+
+
+def _view(segment, rows, field):
+    name, dtype, offset, categories = field
+    array = np.ndarray(rows, np.dtype(dtype), segment.buf, offset)
+    array.flags.writeable = False
+    if categories is not None:
+        # Unvalidated, from_codes wraps the shared codes instead of copying them.
+        return pd.Categorical.from_codes(array, dtype=pd.CategoricalDtype(categories), validate=False)
+    return array
+
+
+def attach(spec):
+    """The frame published as ``spec``, as read-only views of its shared segment."""
+    segment = _attached.get(spec.segment)
+    if segment is None:
+        segment = _attached[spec.segment] = shared_memory.SharedMemory(spec.segment)
+    index = pd.Index(_view(segment, spec.rows, spec.index), name=spec.index[0], copy=False)
+    columns = {field[0]: _view(segment, spec.rows, field) for field in spec.columns}
+    return pd.DataFrame(columns, index=index, copy=False)
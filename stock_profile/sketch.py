@@ -0,0 +1,80 @@
+"""A mergeable quantile sketch for streams of prices.
+
+Values are counted in logarithmically spaced buckets (the DDSketch scheme):
+bucket ``k`` covers ``(gamma**(k-1), gamma**k]`` with
+``gamma = (1 + alpha) / (1 - alpha)``, so any quantile read back is within a
+relative error of ``alpha`` of the true value. Two sketches with the same
+``alpha`` merge by adding bucket counts, which makes them safe to build per
+chunk, per partition or per run and combine afterwards.
+"""
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Log-bucketed counts of positive values with relative accuracy ``alpha``."""
+
+    def __init__(self, alpha=0.005):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, values):
+        """Count an array of positive values."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        if values.min() <= 0:
+            raise ValueError('QuantileSketch only accepts positive values')
+        keys, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype('int64'),
+                                 return_counts=True)
+        buckets = self.buckets
+        for key, n in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + n
+        self.count += len(values)
+
+    def merge(self, other):
+        """Add the counts of ``other`` (built with the same ``alpha``) into this sketch."""
+        if other.alpha != self.alpha:
+            raise ValueError(f'cannot merge sketches with alpha {self.alpha} and {other.alpha}')
+        for key, n in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + n
+        self.count += other.count
+        return self
+
+    def values_and_weights(self):
+        """Bucket representative values and their counts, sorted by value.
+
+        These are the weighted points density estimates are built from.
+        """
+        if not self.buckets:
+            return np.empty(0), np.empty(0, dtype='int64')
+        keys = np.fromiter(sorted(self.buckets), dtype='int64', count=len(self.buckets))
+        weights = np.array([self.buckets[k] for k in keys.tolist()], dtype='int64')
+        # The midpoint in relative terms of (gamma**(k-1), gamma**k].
+        values = 2 * self.gamma ** keys / (self.gamma + 1)
+        return values, weights
+
+    def quantile(self, q):
+        """Approximate the ``q`` quantile(s), ``q`` in [0, 1]."""
+        values, weights = self.values_and_weights()
+        if not len(values):
+            return np.nan if np.ndim(q) == 0 else np.full(np.shape(q), np.nan)
+        ranks = np.asarray(q, dtype='float64') * (self.count - 1)
+        index = np.searchsorted(np.cumsum(weights), ranks, side='right')
+        return values[np.minimum(index, len(values) - 1)]
+
+    def to_dict(self):
+        return {'alpha': self.alpha, 'count': self.count,
+                'buckets': {str(k): n for k, n in self.buckets.items()}}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['alpha'])
+        sketch.buckets = {int(k): n for k, n in state['buckets'].items()}
+        sketch.count = state['count']
+        return sketch
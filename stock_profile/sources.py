@@ -0,0 +1,279 @@
+"""Where price data comes from: local CSV files or a quote service over HTTP.
+
+    python -m stock_profile.sources --source http://127.0.0.1:8060 --out-dir data NFLX DJI AAPL
+    python -m stock_profile.sources --source http://127.0.0.1:8060 --out-dir data --tickers-file sp500.txt
+
+Both sources answer ``source.prices(tickers, start, end)`` with
+``{ticker: frame}`` in the shape :func:`~stock_profile.data.load_prices`
+returns; tickers the source does not have are left out.
+:func:`source_from_spec` picks one from a directory or an ``http://`` URL.
+
+:class:`HttpSource` asks for up to ``batch_size`` tickers per request and
+sends the batches over a pool of keep-alive connections, one thread per
+connection. Connection errors, ``429`` and ``5xx`` answers are retried with
+exponential backoff (or the server's ``Retry-After``). Successful
+responses are kept in an on-disk cache for ``max_age`` seconds, so
+re-running a refresh does not hit the service again. The command line
+writes the fetched tickers as Yahoo-style ``<TICKER>.csv`` files that the
+rest of the package reads; ``python -m stock_profile.quote_server`` is a
+local service to point it at.
+"""
+import argparse
+import contextlib
+import datetime
+import email.utils
+import hashlib
+import http.client
+import io
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import pandas as pd
+
+from stock_profile import trace
+from stock_profile.data import CACHE_DIR, PRICE_COLUMNS, csv_engine, tidy_prices
+from stock_profile.loader import load_many
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_after(value, default):
+    """Seconds to wait for a ``Retry-After`` of delay-seconds or an HTTP-date, else ``default``."""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max((when - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0.0)
+
+
+class SourceError(OSError):
+    """A request to a price source failed for good."""
+
+
+class FileSource:
+    """Price CSVs named ``pattern.format(ticker=...)`` in ``directory``."""
+
+    def __init__(self, directory='.', pattern='{ticker}.csv', workers=32):
+        self.directory = directory
+        self.pattern = pattern
+        self.workers = workers
+
+    def path(self, ticker):
+        return os.path.join(self.directory, self.pattern.format(ticker=ticker))
+
+    def prices(self, tickers, start=None, end=None):
+        """``{ticker: frame}`` for the tickers that have a file, loaded concurrently."""
+        paths = {ticker: self.path(ticker) for ticker in tickers if os.path.exists(self.path(ticker))}
+        frames, _ = load_many(paths.values(), self.workers)
+        return {ticker: frames[path].loc[start:end] for ticker, path in paths.items()}
+
+
+class _ConnectionPool:
+    # Idle keep-alive connections; a connection that fails is dropped, not returned.
+    def __init__(self, host, port, timeout):
+        self.host, self.port, self.timeout = host, port, timeout
+        self._idle = queue.LifoQueue()
+
+    @contextlib.contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        self._idle.put(conn)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class HttpSource:
+    """Daily prices from a quote service speaking ``/v1/prices?symbols=A,B,C``.
+
+    ``stats`` counts ``requests``, ``retries`` and ``cache_hits``. Use as a
+    context manager, or call :meth:`close`, to close pooled connections.
+    """
+
+    def __init__(self, url, batch_size=50, connections=8, retries=4, backoff=0.25,
+                 timeout=30, cache_dir=os.path.join(CACHE_DIR, 'http'), max_age=3600):
+        parts = urlsplit(url)
+        if parts.scheme != 'http':
+            raise ValueError(f'HttpSource needs an http:// URL, not {url!r}')
+        self.prefix = parts.path.rstrip('/')
+        self.batch_size = batch_size
+        self.connections = connections
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._pool = _ConnectionPool(parts.hostname, parts.port or 80, timeout)
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _cache_file(self, target):
+        return os.path.join(self.cache_dir, hashlib.sha1(target.encode()).hexdigest() + '.csv')
+
+    def _cached(self, target):
+        if self.cache_dir is None:
+            return None
+        try:
+            path = self._cache_file(target)
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, target, body):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_file(target)
+        tmp_file = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_file, path)
+
+    def _get(self, target):
+        """Body of ``GET target``, from the cache or the service, retrying transient failures."""
+        body = self._cached(target)
+        if body is not None:
+            self._count('cache_hits')
+            return body
+        delay = error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._count('retries')
+                time.sleep(delay)
+            delay = self.backoff * 2 ** attempt
+            self._count('requests')
+            try:
+                with trace.stage('fetch', target=target) as span, self._pool.connection() as conn:
+                    conn.request('GET', target)
+                    response = conn.getresponse()
+                    body = response.read()
+                    span.set(status=response.status, bytes=len(body))
+            except (OSError, http.client.HTTPException) as exc:
+                error = repr(exc)
+                continue
+            if response.status == 200:
+                self._store(target, body)
+                return body
+            if response.status not in RETRY_STATUSES:
+                raise SourceError(f'GET {target}: HTTP {response.status} {body[:200]!r}')
+            error = f'HTTP {response.status}'
+            delay = _retry_after(response.getheader('Retry-After'), delay)
+        raise SourceError(f'GET {target}: giving up after {self.retries + 1} attempts ({error})')
+
+    def _batch(self, tickers, start, end):
+        params = {'symbols': ','.join(tickers)}
+        if start is not None:
+            params['start'] = str(pd.Timestamp(start).date())
+        if end is not None:
+            params['end'] = str(pd.Timestamp(end).date())
+        body = self._get(f'{self.prefix}/v1/prices?{urlencode(params, safe=",")}')
+        table = pd.read_csv(io.BytesIO(body), parse_dates=['Date'], engine=csv_engine())
+        table = tidy_prices(table.rename(columns=PRICE_COLUMNS))
+        return {ticker: rows.drop(columns='Ticker') for ticker, rows in table.groupby('Ticker', sort=False)}
+
+    def prices(self, tickers, start=None, end=None):
+        """``{ticker: frame}``, fetched ``batch_size`` tickers per request over the pool."""
+        tickers = list(dict.fromkeys(tickers))
+        batches = [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+        frames = {}
+        with ThreadPoolExecutor(self.connections, thread_name_prefix='fetch') as pool:
+            for batch in pool.map(lambda batch: self._batch(batch, start, end), batches):
+                frames.update(batch)
+        return {ticker: frames[ticker] for ticker in tickers if ticker in frames}
+
+    def close(self):
+        self._pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def source_from_spec(spec, **options):
+    """:class:`HttpSource` for an ``http://`` URL, otherwise a :class:`FileSource` directory."""
+    if spec.startswith('http://'):
+        return HttpSource(spec, **options)
+    return FileSource(spec, **options)
+
+
+def write_csvs(frames, out_dir):
+    """Write ``{ticker: frame}`` as Yahoo-style ``<out_dir>/<ticker>.csv`` files; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    yahoo_columns = {price: raw for raw, price in PRICE_COLUMNS.items()}
+    paths = {}
+    for ticker, frame in frames.items():
+        paths[ticker] = os.path.join(out_dir, f'{ticker}.csv')
+        frame.rename(columns=yahoo_columns).to_csv(paths[ticker], date_format='%Y-%m-%d')
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fetch daily prices for many tickers into CSV files.')
+    parser.add_argument('tickers', nargs='*')
+    parser.add_argument('--tickers-file', help='file with one ticker per line')
+    parser.add_argument('--source', required=True, help='data directory or http:// quote service URL')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--start')
+    parser.add_argument('--end')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--connections', type=int, default=8)
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.tickers_file:
+        with open(args.tickers_file) as f:
+            tickers += [line.strip() for line in f if line.strip()]
+    if not tickers:
+        parser.error('no tickers given')
+    options = {}
+    if args.source.startswith('http://'):
+        options = {'batch_size': args.batch_size, 'connections': args.connections}
+    source = source_from_spec(args.source, **options)
+    start = time.perf_counter()
+    with trace.from_arguments(args):
+        frames = source.prices(tickers, args.start, args.end)
+    seconds = time.perf_counter() - start
+    write_csvs(frames, args.out_dir)
+    print(f'{len(frames)}/{len(tickers)} tickers in {seconds:.2f}s')
+    missing = [ticker for ticker in tickers if ticker not in frames]
+    if missing:
+        print('missing: ' + ' '.join(missing))
+    if isinstance(source, HttpSource):
+        print(', '.join(f'{name} {count}' for name, count in sorted(source.stats.items())))
+        source.close()
+
+
+if __name__ == '__main__':
+    main()
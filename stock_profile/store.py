@@ -0,0 +1,142 @@
+"""A memory-mapped date x ticker price store.
+
+All tickers share one on-disk ``prices.npy`` matrix with a row per date and a
+column per ticker. The matrix is written in Fortran order so every ticker's
+history is one contiguous block: looking up a ticker is a dict lookup and
+reading it is a zero-copy view of the mapped file, so slicing Netflix out of
+thousands of Dow constituents never touches the other columns.
+
+Layout of a store directory::
+
+    prices.npy    float matrix, shape (n_dates, n_tickers), Fortran order
+    dates.npy     datetime64[ns] row labels, sorted
+    tickers.json  column labels in column order
+"""
+import functools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from stock_profile.data import csv_engine, load_prices
+from stock_profile.index import PriceIndex
+
+PRICES_FILE = 'prices.npy'
+DATES_FILE = 'dates.npy'
+TICKERS_FILE = 'tickers.json'
+
+
+class PriceStore:
+    """Read-only view of a store directory written by :meth:`PriceStore.write`."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.prices = np.load(os.path.join(directory, PRICES_FILE), mmap_mode='r')
+        self.dates = pd.DatetimeIndex(np.load(os.path.join(directory, DATES_FILE)), name='Date')
+        with open(os.path.join(directory, TICKERS_FILE)) as f:
+            self.tickers = json.load(f)
+        self._columns = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._index = None
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._columns
+
+    def column(self, ticker):
+        """Zero-copy NumPy view of one ticker's prices, aligned with ``dates``."""
+        try:
+            return self.prices[:, self._columns[ticker]]
+        except KeyError:
+            raise KeyError(f'{ticker!r} is not in the price store at {self.directory}') from None
+
+    def series(self, ticker):
+        """One ticker's prices as a Date-indexed Series backed by the mapped file."""
+        return pd.Series(self.column(ticker), index=self.dates, name=ticker, copy=False)
+
+    @property
+    def index(self):
+        """:class:`~stock_profile.index.PriceIndex` over the shared date axis."""
+        if self._index is None:
+            self._index = PriceIndex(self.dates)
+        return self._index
+
+    def window(self, ticker, start=None, end=None):
+        """Zero-copy view of ``ticker``'s prices dated ``start`` to ``end`` inclusive."""
+        return self.column(ticker)[self.index.window(start, end)]
+
+    def quarter(self, ticker, year, quarter):
+        """Zero-copy view of ``ticker``'s prices in one calendar quarter."""
+        return self.column(ticker)[self.index.quarter(year, quarter)]
+
+    def frame(self, ticker):
+        """One ticker as a ``Price``/``Quarter`` frame, the shape the charts expect.
+
+        Dates the ticker did not trade on are dropped, so unlike
+        :meth:`series` this copies the ticker's rows.
+        """
+        prices = self.series(ticker).dropna()
+        frame = prices.to_frame('Price')
+        frame['Quarter'] = pd.Categorical('Q' + frame.index.quarter.astype(str))
+        return frame
+
+    @classmethod
+    def write(cls, directory, prices, dtype='float64', dates=None):
+        """Write ``prices`` to ``directory`` and return the opened store.
+
+        ``prices`` is a date x ticker DataFrame or maps each ticker to a
+        Date-indexed Series or to a function returning one. Loaders are
+        called one at a time as their column is written, so only a single
+        ticker's history is held in memory alongside the mapped matrix.
+        ``dates`` is the union of every ticker's dates; without it a first
+        pass collects each ticker's index, calling every loader twice.
+        """
+        if isinstance(prices, pd.DataFrame):
+            prices = {ticker: prices[ticker] for ticker in prices.columns}
+        if dates is None:
+            dates = pd.DatetimeIndex([])
+            for series in prices.values():
+                dates = dates.union(_series(series).index)
+        dates = pd.DatetimeIndex(dates).unique().sort_values().astype('datetime64[ns]')
+
+        os.makedirs(directory, exist_ok=True)
+        matrix = np.lib.format.open_memmap(
+            os.path.join(directory, PRICES_FILE), mode='w+', dtype=dtype,
+            shape=(len(dates), len(prices)), fortran_order=True)
+        for i, series in enumerate(prices.values()):
+            matrix[:, i] = _series(series).reindex(dates).to_numpy(dtype=dtype, na_value=np.nan)
+        matrix.flush()
+        del matrix
+
+        np.save(os.path.join(directory, DATES_FILE), dates.to_numpy())
+        with open(os.path.join(directory, TICKERS_FILE), 'w') as f:
+            json.dump(list(prices), f)
+        return cls(directory)
+
+    @classmethod
+    def from_csvs(cls, directory, paths, dtype='float64'):
+        """Build a store from ``{ticker: csv_path}`` using each file's ``Price`` column.
+
+        The dates are collected from the files' ``Date`` columns alone, then
+        each CSV is loaded in full only while its column is written.
+        """
+        dates = pd.DatetimeIndex([])
+        for path in paths.values():
+            dates = dates.union(_csv_dates(path))
+        loaders = {ticker: functools.partial(_load_price, path, dtype) for ticker, path in paths.items()}
+        return cls.write(directory, loaders, dtype=dtype, dates=dates)
+
+
+def _series(prices):
+    return prices() if callable(prices) else prices
+
+
+def _load_price(path, dtype):
+    return load_prices(path, dtype)['Price']
+
+
+def _csv_dates(path):
+    return pd.DatetimeIndex(pd.read_csv(path, usecols=['Date'], parse_dates=['Date'],
+                                        engine=csv_engine())['Date'])
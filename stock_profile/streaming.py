@@ -0,0 +1,333 @@
+"""Bounded-memory and incremental ingestion of daily and intraday price files.
+
+:func:`stream_quarterly` reads a price CSV in fixed-size chunks and folds
+each chunk into per-quarter :class:`QuarterAggregate` objects, so a multi-GB
+minute-bar file needs memory for one chunk plus a few hundred sketch buckets
+per quarter. The aggregates carry everything the quarterly distribution
+chart needs; the raw rows are dropped as soon as their chunk is counted.
+
+:func:`update_quarterly` does the same for files that only ever grow. It
+saves the aggregates together with the byte offset it has read up to, and
+on the next run parses only the rows appended since, so a daily refresh
+costs O(new rows) rather than a re-read of the whole history.
+
+:func:`parallel_quarterly` covers decades of minute bars: the file is cut
+into row-aligned byte ranges that worker processes stream in chunks, and
+their per-quarter partials are merged, exactly, in the parent. With
+``by='year'`` quarters are labelled '2017Q1' rather than 'Q1', so each of
+80+ quarters gets its own aggregate.
+"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from stock_profile import trace
+from stock_profile.data import CACHE_DIR
+from stock_profile.sketch import QuantileSketch
+
+CHUNK_ROWS = 1_000_000
+PARTITION_BYTES = 64 * 2**20
+
+
+class QuarterAggregate:
+    """Count, mean/variance, min/max and quantile sketch of one quarter's prices.
+
+    Mean and variance are kept as Welford running moments, merged batch by
+    batch with Chan's parallel update, so they stay exact and numerically
+    stable however the rows are split up.
+    """
+
+    def __init__(self, alpha=0.005):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(alpha)
+
+    def _merge_moments(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, prices):
+        prices = np.asarray(prices, dtype='float64')
+        prices = prices[~np.isnan(prices)]
+        if not len(prices):
+            return
+        mean = prices.mean()
+        self._merge_moments(len(prices), mean, ((prices - mean) ** 2).sum())
+        self.min = min(self.min, prices.min())
+        self.max = max(self.max, prices.max())
+        self.sketch.add(prices)
+
+    def merge(self, other):
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1), as ``Series.var`` reports it."""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def quantile(self, q):
+        return self.sketch.quantile(q)
+
+    def kde_points(self):
+        """Weighted points for a density estimate of this quarter's prices."""
+        return self.sketch.values_and_weights()
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max, 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, state):
+        aggregate = cls(state['sketch']['alpha'])
+        aggregate.count, aggregate.mean, aggregate.m2 = state['count'], state['mean'], state['m2']
+        aggregate.min, aggregate.max = state['min'], state['max']
+        aggregate.sketch = QuantileSketch.from_dict(state['sketch'])
+        return aggregate
+
+
+def quarter_labels(dates):
+    """'Q1'..'Q4' labels for a datetime-like array, matching the CSV's ``Quarter``."""
+    return 'Q' + pd.DatetimeIndex(dates).quarter.astype(str)
+
+
+def year_quarter_labels(dates):
+    """'2017Q1'-style labels for a datetime-like array; they sort in date order."""
+    dates = pd.DatetimeIndex(dates)
+    return dates.year.astype(str) + 'Q' + dates.quarter.astype(str)
+
+
+def summarize(aggregates):
+    """One row of summary statistics per quarter, read from the aggregates alone."""
+    rows = {}
+    for quarter, aggregate in aggregates.items():
+        q25, median, q75 = aggregate.quantile([0.25, 0.5, 0.75])
+        rows[quarter] = {'count': aggregate.count, 'mean': aggregate.mean, 'std': aggregate.std,
+                         'min': aggregate.min, '25%': q25, '50%': median, '75%': q75,
+                         'max': aggregate.max}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def _columns(header, by='quarter'):
+    price_column = 'Price' if 'Price' in header else 'Adj Close'
+    return price_column, 'Quarter' if by == 'quarter' and 'Quarter' in header else 'Date'
+
+
+def _fold_chunks(aggregates, chunks, price_column, key_column, alpha, by='quarter'):
+    labels = year_quarter_labels if by == 'year' else quarter_labels
+    for chunk in chunks:
+        keys = chunk[key_column] if key_column == 'Quarter' else labels(chunk['Date'])
+        for quarter, prices in chunk[price_column].groupby(np.asarray(keys), sort=False):
+            if quarter not in aggregates:
+                aggregates[quarter] = QuarterAggregate(alpha)
+            aggregates[quarter].update(prices.to_numpy())
+    return dict(sorted(aggregates.items()))
+
+
+def stream_quarterly(path, chunksize=CHUNK_ROWS, alpha=0.005, by='quarter'):
+    """Aggregate the ``Price`` column of a CSV per ``Quarter`` in bounded memory.
+
+    Files without a ``Quarter`` column get one derived from ``Date``;
+    ``by='year'`` always derives '2017Q1'-style labels from ``Date``.
+    Returns ``{quarter: QuarterAggregate}`` in quarter order.
+    """
+    with trace.stage('load', path=path, mode='stream') as span:
+        price_column, key_column = _columns(pd.read_csv(path, nrows=0).columns, by)
+        chunks = pd.read_csv(path, usecols=[price_column, key_column], chunksize=chunksize,
+                             dtype={price_column: 'float64'})
+        aggregates = _fold_chunks({}, chunks, price_column, key_column, alpha, by)
+        span.set(rows=sum(a.count for a in aggregates.values()))
+    return aggregates
+
+
+class _BoundedReader:
+    """File wrapper that stops at ``end`` so rows appended mid-read wait for the next run."""
+
+    def __init__(self, f, end):
+        self.f = f
+        self.end = end
+
+    def read(self, size=-1):
+        remaining = self.end - self.f.tell()
+        if size < 0 or size > remaining:
+            size = remaining
+        return self.f.read(max(size, 0))
+
+
+def _complete_rows_end(f, size):
+    """Offset just past the last newline, so a half-written final row is left alone."""
+    position = size
+    while position > 0:
+        step = min(4096, position)
+        f.seek(position - step)
+        block = f.read(step)
+        newline = block.rfind(b'\n')
+        if newline >= 0:
+            return position - step + newline + 1
+        position -= step
+    return 0
+
+
+def _partition_offsets(f, start, size, partition_bytes):
+    """Row-aligned ``(start, end)`` byte ranges of roughly ``partition_bytes`` each."""
+    edges = [start]
+    for target in range(start + partition_bytes, size, partition_bytes):
+        f.seek(max(target - 1, edges[-1]))
+        f.readline()
+        if f.tell() >= size:
+            break
+        if f.tell() > edges[-1]:
+            edges.append(f.tell())
+    edges.append(size)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _aggregate_range(path, start, end, columns, by, chunksize, alpha):
+    with trace.stage('load', path=path, mode='partition', bytes=end - start) as span, open(path, 'rb') as f:
+        price_column, key_column = _columns(columns, by)
+        f.seek(start)
+        chunks = pd.read_csv(_BoundedReader(f, end), header=None, names=columns,
+                             usecols=[price_column, key_column], chunksize=chunksize,
+                             dtype={price_column: 'float64'})
+        aggregates = _fold_chunks({}, chunks, price_column, key_column, alpha, by)
+        span.set(rows=sum(a.count for a in aggregates.values()))
+    return aggregates
+
+
+def parallel_quarterly(path, by='year', workers=None, partition_bytes=PARTITION_BYTES,
+                       chunksize=CHUNK_ROWS, alpha=0.005):
+    """:func:`stream_quarterly` split across worker processes.
+
+    The CSV is cut at row boundaries into ranges of about
+    ``partition_bytes``; each worker streams its range ``chunksize`` rows at
+    a time, so a worker holds one chunk at most, and quarters that straddle
+    ranges are merged. Every row is read, including an unterminated last
+    one; counts, min/max and sketches match :func:`stream_quarterly`
+    exactly, and means and variances up to floating-point rounding. Returns ``{quarter: QuarterAggregate}`` in order.
+    """
+    with open(path, 'rb') as f:
+        header = f.readline()
+        columns = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+        size = os.fstat(f.fileno()).st_size
+        ranges = [(start, end) for start, end in _partition_offsets(f, len(header), size, partition_bytes)
+                  if end > start]
+    aggregates = {}
+    with trace.stage('parallel_quarterly', path=path, partitions=len(ranges)), \
+            ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_aggregate_range, path, start, end, columns, by, chunksize, alpha)
+                   for start, end in ranges]
+        for future in as_completed(futures):
+            for quarter, partial in future.result().items():
+                if quarter in aggregates:
+                    aggregates[quarter].merge(partial)
+                else:
+                    aggregates[quarter] = partial
+    return dict(sorted(aggregates.items()))
+
+
+def _fingerprint(f, offset):
+    """Hash of the first and last 4 KiB read so far, to tell appends from rewrites."""
+    digest = hashlib.sha1()
+    f.seek(0)
+    digest.update(f.read(min(offset, 4096)))
+    start = max(offset - 4096, 0)
+    f.seek(start)
+    digest.update(f.read(offset - start))
+    return digest.hexdigest()
+
+
+def state_path(path):
+    """Default location of the saved aggregates for ``path``."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR, f'{stem}.quarterly.json')
+
+
+def update_quarterly(path, saved=None, chunksize=CHUNK_ROWS, alpha=0.005):
+    """Bring the saved per-quarter aggregates of an append-only CSV up to date.
+
+    Only rows after the previously read offset are parsed. If the file was
+    rewritten rather than appended to (it shrank, or the bytes before the
+    saved offset changed at its start or end) the aggregates are rebuilt from the start.
+    ``saved`` is the JSON state file, by default under ``.stock_cache/``; if
+    it cannot be written the result is still returned.
+    A last row without a trailing newline is counted in the result but not
+    saved, so it is read again next time in case it was still being written.
+    Returns ``{quarter: QuarterAggregate}`` in quarter order.
+    """
+    saved = saved or state_path(path)
+    try:
+        with open(saved) as f:
+            state = json.load(f)
+    except OSError:
+        state = None
+
+    with open(path, 'rb') as f:
+        header = f.readline()
+        columns = pd.read_csv(io.BytesIO(header), nrows=0).columns
+        price_column, key_column = _columns(columns)
+        size = os.fstat(f.fileno()).st_size
+        if state is not None and state['header'] == header.decode() and state['offset'] <= size \
+                and _fingerprint(f, state['offset']) == state['fingerprint']:
+            offset = state['offset']
+            aggregates = {q: QuarterAggregate.from_dict(a) for q, a in state['quarters'].items()}
+        else:
+            offset = len(header)
+            aggregates = {}
+
+        end = _complete_rows_end(f, size)
+        if end > offset:
+            with trace.stage('load', path=path, mode='append', bytes=end - offset) as span:
+                before = sum(a.count for a in aggregates.values())
+                f.seek(offset)
+                chunks = pd.read_csv(_BoundedReader(f, end), header=None, names=list(columns),
+                                     usecols=[price_column, key_column], chunksize=chunksize,
+                                     dtype={price_column: 'float64'})
+                aggregates = _fold_chunks(aggregates, chunks, price_column, key_column, alpha)
+                span.set(rows=sum(a.count for a in aggregates.values()) - before)
+            offset = end
+        fingerprint = _fingerprint(f, offset)
+        f.seek(offset)
+        tail = f.read(size - offset)
+
+    tmp_file = f'{saved}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(saved) or '.', exist_ok=True)
+        with open(tmp_file, 'w') as f:
+            json.dump({'header': header.decode(), 'offset': offset, 'fingerprint': fingerprint,
+                       'quarters': {q: a.to_dict() for q, a in aggregates.items()}}, f)
+        os.replace(tmp_file, saved)
+    except OSError:
+        # Unsaved, the next run just reads more of the file again.
+        with contextlib.suppress(OSError):
+            os.remove(tmp_file)
+    if tail.strip():
+        # The last row has no newline yet: count it now, but leave it out of the
+        # saved state so the next run reads it again, finished or not.
+        try:
+            rows = pd.read_csv(io.BytesIO(tail), header=None, names=list(columns),
+                               usecols=[price_column, key_column], dtype={price_column: 'float64'})
+            aggregates = _fold_chunks(aggregates, [rows], price_column, key_column, alpha)
+        except (ValueError, pd.errors.ParserError):
+            pass  # still being written
+    return aggregates
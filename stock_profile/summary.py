@@ -0,0 +1,241 @@
+"""Per-(ticker, quarter) summary table shared by the quarterly charts.
+
+    python -m stock_profile.summary --out quarterly_summary.parquet \\
+        NFLX=NFLX_daily_by_quarter.csv AAPL=AAPL_daily.csv
+
+A summary row holds everything the quarterly charts draw for one ticker
+and quarter: price quantiles every 5% (``p00`` ... ``p100``, float32),
+mean, annualised volatility of daily log returns, total volume, the
+quarter's return, and reported revenue, earnings and EPS actual/estimate
+where they are known. The table is written to Parquet sorted by ticker and
+quarter, so :func:`read_summary` for a few tickers and columns reads a few
+kilobytes however long the history or ticker list is.
+
+Charts take rows rather than raw prices: :func:`aggregates` gives the
+distribution chart one :class:`QuarterProfile` per quarter, with the same
+``quantile``/``kde_points`` interface as a streamed
+:class:`~stock_profile.streaming.QuarterAggregate`, and :func:`earnings`
+gives the EPS chart its ``Quarter``/``Actual``/``Estimate`` table.
+"""
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from stock_profile import trace
+from stock_profile.index import PriceIndex
+from stock_profile.loader import load_many
+
+QUANTILES = np.linspace(0, 1, 21)
+QUANTILE_COLUMNS = [f'p{round(q * 100):02d}' for q in QUANTILES]
+PRICE_SUMMARY_COLUMNS = ['ticker', 'quarter', 'days', 'mean', 'volatility', 'return', 'volume'] + QUANTILE_COLUMNS
+FUNDAMENTAL_COLUMNS = ['revenue', 'earnings', 'eps_actual', 'eps_estimate']
+TRADING_DAYS = 252
+ROW_GROUP_SIZE = 16_384
+
+
+def quarter_period(label):
+    """``pandas.Period`` for '2017Q1', 'Q1 2017' or the notebook's '1Q2017'."""
+    match = re.fullmatch(r'\s*([1-4])Q(\d{4})\s*', str(label))
+    if match:
+        return pd.Period(year=int(match[2]), quarter=int(match[1]), freq='Q')
+    return pd.Period(label, freq='Q')
+
+
+def ticker_summary(ticker, prices):
+    """Summary rows for one ticker's Date-indexed prices (as from ``load_prices``)."""
+    price = prices['Price'].to_numpy('float64')
+    slices = PriceIndex(prices.index).quarters()
+    starts = np.array([rows.start for rows in slices.values()], dtype='intp')
+    counts = np.array([rows.stop - rows.start for rows in slices.values()], dtype='intp')
+    codes = np.repeat(np.arange(len(starts)), counts)
+
+    # Sorting by (quarter, price) puts every quarter's prices in order in one pass.
+    ordered = price[np.lexsort((price, codes))]
+    position = starts[:, None] + QUANTILES[None, :] * (counts[:, None] - 1)
+    below = np.floor(position).astype('intp')
+    above = np.minimum(below + 1, (starts + counts - 1)[:, None])
+    fraction = position - below
+    quantiles = ordered[below] * (1 - fraction) + ordered[above] * fraction
+
+    log_returns = pd.Series(np.diff(np.log(price), prepend=np.nan))
+    closes = price[starts + counts - 1]
+    previous = np.r_[price[0], closes[:-1]]
+    frame = pd.DataFrame({
+        'ticker': ticker,
+        'quarter': [str(period) for period in slices],
+        'days': counts.astype('int32'),
+        'mean': np.add.reduceat(price, starts) / counts,
+        'volatility': log_returns.groupby(codes).std().to_numpy() * np.sqrt(TRADING_DAYS),
+        'return': closes / previous - 1,
+        'volume': (np.add.reduceat(prices['Volume'].to_numpy('int64', na_value=0), starts)
+                   if 'Volume' in prices else np.zeros(len(starts), dtype='int64')),
+    })
+    return pd.concat([frame, pd.DataFrame(quantiles.astype('float32'), columns=QUANTILE_COLUMNS)], axis=1)
+
+
+def fundamentals_frame(ticker, eps=None, revenue=None):
+    """Reported figures for one ticker from dicts shaped like
+    :data:`~stock_profile.data.NETFLIX_EPS_2017` and ``NETFLIX_REVENUE_2017``."""
+    columns = {}
+    if eps is not None:
+        quarters = [str(quarter_period(label)) for label in eps['labels']]
+        columns['eps_actual'] = pd.Series(eps['actual'], index=quarters, dtype='float64')
+        columns['eps_estimate'] = pd.Series(eps['estimate'], index=quarters, dtype='float64')
+    if revenue is not None:
+        quarters = [str(quarter_period(label)) for label in revenue['labels']]
+        columns['revenue'] = pd.Series(revenue['revenue'], index=quarters, dtype='float64')
+        columns['earnings'] = pd.Series(revenue['earnings'], index=quarters, dtype='float64')
+    frame = pd.DataFrame(columns).reindex(columns=FUNDAMENTAL_COLUMNS)
+    return frame.rename_axis('quarter').reset_index().assign(ticker=ticker)
+
+
+def build_summary(prices, fundamentals=()):
+    """The summary table for ``{ticker: prices frame}`` and any fundamentals frames.
+
+    Quarters with fundamentals but no prices (e.g. a report ahead of the
+    price data) get a row with only the fundamentals filled in.
+    """
+    with trace.stage('summary', tickers=len(prices)) as span:
+        parts = [ticker_summary(ticker, frame) for ticker, frame in prices.items() if len(frame)]
+        table = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=PRICE_SUMMARY_COLUMNS)
+        extra = [frame for frame in fundamentals if len(frame)]
+        if extra:
+            table = table.merge(pd.concat(extra, ignore_index=True), on=['ticker', 'quarter'], how='outer')
+        else:
+            table = table.reindex(columns=list(table.columns) + FUNDAMENTAL_COLUMNS)
+        table = table.sort_values(['ticker', 'quarter'], ignore_index=True)
+        table = table.astype({'days': 'Int32', 'volume': 'Int64'})
+        span.set(rows=len(table))
+    return table
+
+
+def write_summary(table, path):
+    """Write a summary table to Parquet in row groups that ticker filters can skip."""
+    table.to_parquet(path, index=False, row_group_size=ROW_GROUP_SIZE)
+    return path
+
+
+def ensure_summary(path, sources, fundamentals=()):
+    """Build ``path`` from ``{ticker: price CSV}`` unless it is newer than every CSV.
+
+    Returns ``path``. Changes to ``fundamentals`` alone are not noticed;
+    delete the file to pick them up. Call it once before starting workers
+    that read the table, rather than from each worker.
+    """
+    if os.path.exists(path) and all(os.path.getmtime(path) >= os.path.getmtime(csv)
+                                    for csv in sources.values()):
+        return path
+    frames, _ = load_many(sources.values())
+    table = build_summary({ticker: frames[csv] for ticker, csv in sources.items()}, fundamentals)
+    tmp_file = f'{path}.{os.getpid()}.tmp'
+    write_summary(table, tmp_file)
+    os.replace(tmp_file, path)
+    return path
+
+
+def read_summary(path, tickers=None, columns=None, start=None, end=None):
+    """Summary rows for ``tickers`` (default all) with only ``columns`` read.
+
+    ``start``/``end`` are quarters such as '2015Q1', both inclusive.
+    """
+    filters = []
+    if tickers is not None:
+        filters.append(('ticker', 'in', list(tickers)))
+    if start is not None:
+        filters.append(('quarter', '>=', str(quarter_period(start))))
+    if end is not None:
+        filters.append(('quarter', '<=', str(quarter_period(end))))
+    if columns is not None:
+        columns = ['ticker', 'quarter'] + [c for c in columns if c not in ('ticker', 'quarter')]
+    return pd.read_parquet(path, columns=columns, filters=filters or None)
+
+
+class QuarterProfile:
+    """One summary row viewed as a quarter's price distribution."""
+
+    def __init__(self, row):
+        self.quantiles = np.asarray([row[column] for column in QUANTILE_COLUMNS], dtype='float64')
+        self.count = int(row['days'])
+        self.mean = float(row['mean'])
+
+    def quantile(self, q):
+        return np.interp(q, QUANTILES, self.quantiles)
+
+    def kde_points(self):
+        """Midpoints between neighbouring quantiles, each carrying the rows between them."""
+        points = (self.quantiles[1:] + self.quantiles[:-1]) / 2
+        return points, np.full(len(points), self.count * np.diff(QUANTILES)[0])
+
+
+def _label(quarter, same_year):
+    period = quarter_period(quarter)
+    return f'Q{period.quarter}' if same_year else str(period)
+
+
+def aggregates(rows, by_year=False):
+    """``{label: QuarterProfile}`` for one ticker's rows that have prices.
+
+    Labels are 'Q1'..'Q4' when the rows span one year, otherwise '2017Q1'
+    style, so the result can go straight to
+    :func:`~stock_profile.charts.distribution_chart`. ``by_year=True``
+    always gives '2017Q1' labels.
+    """
+    rows = rows[rows['days'].notna()]
+    same_year = not by_year and rows['quarter'].str[:4].nunique() <= 1
+    return {_label(row['quarter'], same_year): QuarterProfile(row) for _, row in rows.iterrows()}
+
+
+def _report_label(quarter):
+    period = quarter_period(quarter)
+    return f'{period.quarter}Q{period.year}'
+
+
+def earnings(rows):
+    """An :mod:`~stock_profile.earnings` table from rows with EPS figures,
+    quarters labelled '1Q2017' as in earnings reports."""
+    rows = rows[rows['eps_actual'].notna()]
+    return pd.DataFrame({'Ticker': rows['ticker'].to_numpy(),
+                         'Quarter': [_report_label(quarter) for quarter in rows['quarter']],
+                         'Actual': rows['eps_actual'].to_numpy(), 'Estimate': rows['eps_estimate'].to_numpy()})
+
+
+def revenue(rows):
+    """``(labels, revenue, earnings)`` for the revenue/earnings chart, labelled like :func:`earnings`."""
+    rows = rows[rows['revenue'].notna()]
+    return ([_report_label(quarter) for quarter in rows['quarter']],
+            rows['revenue'].to_numpy(), rows['earnings'].to_numpy())
+
+
+def _parse_source(spec):
+    ticker, sep, path = spec.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f'expected TICKER=CSV, got {spec!r}')
+    return ticker, path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the per-(ticker, quarter) summary table.')
+    parser.add_argument('sources', nargs='+', type=_parse_source, metavar='TICKER=CSV')
+    parser.add_argument('--out', default='quarterly_summary.parquet')
+    parser.add_argument('--netflix-fundamentals', action='store_true',
+                        help="add Netflix's 2017 EPS and revenue figures for NFLX")
+    trace.add_arguments(parser)
+    args = parser.parse_args(argv)
+    with trace.from_arguments(args):
+        sources = dict(args.sources)
+        frames, _ = load_many(sources.values())
+        fundamentals = []
+        if args.netflix_fundamentals:
+            from stock_profile.data import NETFLIX_EPS_2017, NETFLIX_REVENUE_2017
+
+            fundamentals.append(fundamentals_frame('NFLX', NETFLIX_EPS_2017, NETFLIX_REVENUE_2017))
+        table = build_summary({ticker: frames[path] for ticker, path in sources.items()}, fundamentals)
+        write_summary(table, args.out)
+    print(f'{len(table)} rows for {table["ticker"].nunique()} tickers -> {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Reusable chart figures for rendering the same layout for many tickers.
+
+Building a figure (axes, tick locators, titles, labels, legends) costs more
+than drawing the data into it. A template builds its chart with the first
+ticker's data through the normal :mod:`stock_profile.charts` builder, then
+for every later ticker only swaps the artists' data: ``Line2D.set_data`` for
+price lines, ``set_offsets`` for the EPS scatter, ``set_verts`` for the bar
+collection. Keep one :class:`TemplatePool` per worker process; figures are
+not safe to share between threads.
+"""
+import numpy as np
+
+from stock_profile import charts
+from stock_profile.downsample import axes_pixel_width, minmax
+
+
+def _new_figure():
+    from matplotlib.figure import Figure
+
+    return Figure()
+
+
+def _rescale(ax, points):
+    ax.ignore_existing_data_limits = True
+    ax.update_datalim(points)
+    ax.autoscale_view()
+
+
+class ComparisonTemplate:
+    """:func:`stock_profile.charts.comparison_chart` with reusable panels."""
+
+    def __init__(self):
+        self.fig = None
+
+    def render(self, netflix, dowjones, names=('Netflix', 'Dow Jones')):
+        if self.fig is None:
+            self.fig = charts.comparison_chart(_new_figure(), netflix, dowjones, names)
+            return self.fig
+        for ax, frame, name in zip(self.fig.axes, (netflix, dowjones), names):
+            x, y = minmax(frame.index.to_numpy(), frame['Price'].to_numpy(), axes_pixel_width(ax))
+            ax.lines[0].set_data(x, y)
+            ax.relim()
+            ax.autoscale_view()
+            ax.set_title(name)
+        return self.fig
+
+
+class DistributionTemplate:
+    """:func:`stock_profile.charts.distribution_chart`; the violins are redrawn
+    but the figure, axes and labels are kept."""
+
+    def __init__(self):
+        self.fig = None
+
+    def render(self, aggregates, name='Netflix', period='2017'):
+        if self.fig is None:
+            self.fig = charts.distribution_chart(_new_figure(), aggregates, name, period)
+            return self.fig
+        ax = self.fig.axes[0]
+        for artist in list(ax.collections):
+            artist.remove()
+        ax.ignore_existing_data_limits = True
+        charts.violin_from_aggregates(ax, aggregates)
+        ax.autoscale_view()
+        charts.label_distribution(ax, name, period)
+        return self.fig
+
+
+class EpsTemplate:
+    """:func:`stock_profile.charts.eps_chart` with a reusable scatter."""
+
+    def __init__(self):
+        self.fig = None
+
+    def render(self, earnings):
+        if self.fig is None:
+            self.fig = charts.eps_chart(_new_figure(), earnings)
+            return self.fig
+        ax = self.fig.axes[0]
+        offsets, facecolors, labels = charts.eps_points(earnings)
+        scatter = ax.collections[0]
+        scatter.set_offsets(offsets)
+        scatter.set_facecolor(facecolors)
+        ax.set_xticks(range(1, len(labels) + 1))
+        ax.set_xticklabels(labels)
+        _rescale(ax, offsets)
+        return self.fig
+
+
+class RevenueTemplate:
+    """:func:`stock_profile.charts.revenue_earnings_chart` with a reusable bar collection."""
+
+    def __init__(self):
+        self.fig = None
+        self.shape = None
+
+    def render(self, labels, revenue, earnings, width=.8, name='Netflix'):
+        values = np.array([revenue, earnings], dtype='float64')
+        if self.fig is None or values.shape != self.shape:
+            # A different number of bars changes the colours and ticks; start over.
+            self.fig = charts.revenue_earnings_chart(_new_figure(), labels, revenue, earnings, width, name)
+            self.shape = values.shape
+            return self.fig
+        ax = self.fig.axes[0]
+        corners, centers = charts.grouped_bar_corners(values, width)
+        ax.collections[0].set_verts(corners)
+        ax.set_xticks(centers.mean(axis=0))
+        ax.set_xticklabels(labels)
+        _rescale(ax, corners.reshape(-1, 2))
+        ax.set_title(f'{name} Revenue and Earnings in $ Billions')
+        return self.fig
+
+
+TEMPLATES = {
+    'comparison': ComparisonTemplate,
+    'distribution': DistributionTemplate,
+    'eps': EpsTemplate,
+    'revenue': RevenueTemplate,
+}
+
+
+class TemplatePool:
+    """One template per chart, built on first use: ``pool.render('eps', earnings)``."""
+
+    def __init__(self):
+        self._templates = {}
+
+    def render(self, chart, *args, **kwargs):
+        if chart not in self._templates:
+            self._templates[chart] = TEMPLATES[chart]()
+        return self._templates[chart].render(*args, **kwargs)
@@ -0,0 +1,190 @@
+"""Stage-level timing for the chart pipeline.
+
+Wrap a step in :func:`stage` to record its wall time, CPU time, net
+allocated bytes (when memory tracing is on) and any tags such as the
+ticker, chart or row count::
+
+    with trace.stage('load', path=path) as span:
+        frame = pd.read_csv(path)
+        span.set(rows=len(frame))
+
+Tracing is off until :func:`enable` is called. While off, ``stage`` returns
+a shared do-nothing context, so the hooks left in the pipeline cost one
+global lookup each.
+
+When enabled with a ``log_path``, every finished stage is appended to that
+file as one JSON line. Worker processes inherit the setting and append to
+the same file, with their own pid on each line. :func:`chrome_trace` turns
+such a log into a Chrome-trace/Perfetto JSON file.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+LOG_ENV = 'STOCK_PROFILE_TRACE_LOG'
+
+_tracer = None
+
+
+class _NullSpan:
+    def set(self, **tags):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, tags):
+        self.tracer = tracer
+        self.name = name
+        self.tags = tags
+
+    def set(self, **tags):
+        self.tags.update(tags)
+
+    def __enter__(self):
+        if self.tracer.memory:
+            self._bytes = tracemalloc.get_traced_memory()[0]
+        self._cpu = time.process_time_ns()
+        self._start = time.time_ns()
+        self._wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter_ns() - self._wall
+        event = {'stage': self.name, 'start_us': self._start // 1000, 'wall_us': wall // 1000,
+                 'cpu_us': (time.process_time_ns() - self._cpu) // 1000,
+                 'pid': os.getpid(), 'tid': threading.get_ident()}
+        if self.tracer.memory:
+            event['alloc_bytes'] = tracemalloc.get_traced_memory()[0] - self._bytes
+        if exc_type is not None:
+            event['error'] = exc_type.__name__
+        event.update(self.tags)
+        self.tracer.record(event)
+        return False
+
+
+class Tracer:
+    def __init__(self, log_path=None, memory=False):
+        self.log_path = log_path
+        self.memory = memory
+        self.events = []
+        self._fd = None
+        if log_path is not None:
+            self._fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def record(self, event):
+        self.events.append(event)
+        if self._fd is not None:
+            # One write per line keeps lines from different processes whole.
+            os.write(self._fd, (json.dumps(event, default=str) + '\n').encode())
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def enabled():
+    return _tracer is not None
+
+
+def stage(name, **tags):
+    """Context manager timing one pipeline stage; see the module docstring."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, tags)
+
+
+def enable(log_path=None, memory=False):
+    """Start recording stages in this process and in workers it starts.
+
+    ``memory=True`` also records net allocated bytes via tracemalloc, which
+    slows allocation-heavy code down noticeably.
+    """
+    global _tracer
+    disable()
+    _tracer = Tracer(log_path, memory)
+    if log_path is not None:
+        os.environ[LOG_ENV] = json.dumps({'log_path': os.path.abspath(log_path), 'memory': memory})
+    return _tracer
+
+
+def disable(trace_path=None):
+    """Stop recording; with ``trace_path``, write this process's stages as a Chrome trace."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    os.environ.pop(LOG_ENV, None)
+    if tracer is None:
+        return
+    tracer.close()
+    if trace_path is not None:
+        _write_chrome_trace(tracer.events, trace_path)
+
+
+def read_log(log_path):
+    with open(log_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_chrome_trace(events, trace_path):
+    trace_events = []
+    for event in events:
+        args = {k: v for k, v in event.items()
+                if k not in ('stage', 'start_us', 'wall_us', 'pid', 'tid')}
+        trace_events.append({'name': event['stage'], 'cat': 'stock_profile', 'ph': 'X',
+                             'ts': event['start_us'], 'dur': event['wall_us'],
+                             'pid': event['pid'], 'tid': event['tid'], 'args': args})
+    with open(trace_path, 'w') as f:
+        json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+
+
+def chrome_trace(log_path, trace_path):
+    """Convert a JSON-lines stage log into a Chrome-trace/Perfetto JSON file."""
+    _write_chrome_trace(read_log(log_path), trace_path)
+
+
+def add_arguments(parser):
+    """Add ``--trace-log``, ``--chrome-trace`` and ``--trace-memory`` options to a command-line parser."""
+    parser.add_argument('--trace-log', metavar='PATH',
+                        help='append a JSON line per pipeline stage to PATH')
+    parser.add_argument('--chrome-trace', metavar='PATH',
+                        help='also write the stages as a Chrome-trace/Perfetto JSON file')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='also record allocated bytes per stage (slower; needs --trace-log or --chrome-trace)')
+
+
+@contextlib.contextmanager
+def from_arguments(args):
+    """Trace for the duration of a ``with`` block as the parsed options ask."""
+    log_path, trace_path = args.trace_log, args.chrome_trace
+    if not (log_path or trace_path):
+        yield
+        return
+    # Workers only report back through the log, so a Chrome trace needs one too.
+    log_path = log_path or trace_path + '.jsonl'
+    enable(log_path, memory=args.trace_memory)
+    try:
+        yield
+    finally:
+        disable()
+        if trace_path:
+            chrome_trace(log_path, trace_path)
+
+
+# Worker processes started with spawn pick the parent's settings up here.
+if os.environ.get(LOG_ENV):
+    _settings = json.loads(os.environ[LOG_ENV])
+    _tracer = Tracer(_settings['log_path'], _settings['memory'])
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from stock_profile import build, render
+
+YAHOO = ['Open', 'High', 'Low', 'Close', 'Adj Close']
+
+
+def _write_prices(path, dates, seed, quarters=False):
+    close = 100 + np.random.default_rng(seed).normal(0, 1, len(dates)).cumsum()
+    frame = pd.DataFrame({column: close for column in YAHOO}, index=pd.Index(dates, name='Date'))
+    frame['Volume'] = 1000
+    if quarters:
+        frame['Quarter'] = 'Q' + dates.quarter.astype(str)
+    frame.to_csv(path, date_format='%Y-%m-%d')
+
+
+def test_targets_follow_render_charts_and_rebuild_only_what_changed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    daily = pd.bdate_range('2017-01-02', '2017-12-29')
+    _write_prices('NFLX_daily_by_quarter.csv', daily, 0, quarters=True)
+    _write_prices('NFLX.csv', daily[::21], 1)
+    _write_prices('DJI.csv', daily[::21], 2)
+
+    targets = build.notebook_targets()
+    charts = {target.name: (target.output, target.save_options) for target in targets[:len(render.CHARTS)]}
+    assert charts == {name: (filename, options) for name, (_, filename, options) in render.CHARTS.items()}
+    assert set(build.build(targets, 'out').values()) == {'built'}
+
+    with open('NFLX_daily_by_quarter.csv', 'a') as f:
+        f.write('2017-12-31,150,150,150,150,150,1000,Q4\n')
+    status = build.build(build.notebook_targets(), 'out')
+    assert sorted(name for name, state in status.items() if state == 'built') == ['distribution', 'distribution_Q4']
@@ -0,0 +1,12 @@
+import pandas as pd
+
+from stock_profile.data import read_prices
+
+
+def test_unwritable_cache_still_returns_prices(tmp_path):
+    csv = tmp_path / 'NFLX.csv'
+    pd.DataFrame({'Date': ['2017-01-03', '2017-01-04'], 'Adj Close': [127.5, 129.4]}).to_csv(csv, index=False)
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    frame = read_prices(str(csv), cache_dir=str(blocker / 'cache'))
+    assert frame['Price'].tolist() == [127.5, 129.4]
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from stock_profile import charts
+from stock_profile.kde import binned_densities, violin_curves
+from stock_profile.streaming import stream_quarterly
+
+
+def _quarters(prices_by_quarter):
+    return pd.DataFrame({
+        'Quarter': [q for q, prices in prices_by_quarter.items() for _ in prices],
+        'Price': [p for prices in prices_by_quarter.values() for p in prices],
+    })
+
+
+def test_single_row_and_flat_groups_get_curves():
+    rng = np.random.default_rng(0)
+    frame = _quarters({'Q1': rng.normal(100, 5, 60), 'Q2': [120.0], 'Q3': [110.0] * 5})
+    codes, labels = pd.factorize(frame['Quarter'], sort=True)
+    binned = binned_densities(frame['Price'].to_numpy(), codes, len(labels))
+    assert (binned['bandwidths'] >= (binned['grid'][1] - binned['grid'][0]) / 2).all()
+    for grid, density in violin_curves(binned):
+        assert len(grid) and len(density) and density.max() > 0
+
+
+def test_violin_from_frame_with_one_row_quarter():
+    frame = _quarters({'Q1': np.linspace(90, 110, 50), 'Q2': [120.0]})
+    ax = Figure().add_subplot()
+    charts.violin_from_frame(ax, frame)
+    assert [t.get_text() for t in ax.get_xticklabels()] == ['Q1', 'Q2']
+
+
+def test_draw_violins_draws_a_line_for_an_empty_curve():
+    ax = Figure().add_subplot()
+    grid = np.linspace(0, 1, 5)
+    charts.draw_violins(ax, ['a', 'b'], [grid, np.array([])], [np.ones(5), np.array([])],
+                        [(0.25, 0.5, 0.75), (1, 1, 1)])
+    assert len(ax.collections) >= 3
+
+
+def test_history_chart_with_first_day_of_a_quarter(tmp_path):
+    dates = pd.bdate_range('2017-10-02', '2018-01-01')
+    path = tmp_path / 'prices.csv'
+    pd.DataFrame({'Date': dates.strftime('%Y-%m-%d'),
+                  'Adj Close': np.linspace(100, 130, len(dates))}).to_csv(path, index=False)
+    aggregates = stream_quarterly(path, by='year')
+    assert aggregates['2018Q1'].count == 1
+    fig = charts.history_distribution_chart(Figure(), aggregates, 'Test')
+    assert len(fig.axes[0].get_xticks()) == 2
@@ -0,0 +1,38 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_profile.server import ChartData, ChartServer, RequestError
+
+
+def _server():
+    dates = pd.bdate_range('2016-01-01', '2018-12-31', name='Date')
+    frame = pd.DataFrame({'Price': np.linspace(100, 200, len(dates))}, index=dates)
+    return ChartServer(ChartData({'NFLX': frame}))
+
+
+def _series(server, start, end, width):
+    query = {'ticker': ['NFLX'], 'start': [start], 'end': [end], 'width': [str(width)]}
+    return asyncio.run(server.respond('series', query))
+
+
+def test_nearby_windows_share_a_tile():
+    server = _server()
+    first = _series(server, '2017-01-03', '2017-03-10', 790)
+    panned = _series(server, '2017-01-05', '2017-03-12', 800)
+    assert panned == first
+    assert (server.misses, server.hits) == (1, 1)
+
+
+def test_zooming_out_changes_the_tile():
+    server = _server()
+    _series(server, '2017-01-03', '2017-03-10', 800)
+    _series(server, '2017-01-03', '2017-12-29', 800)
+    assert server.misses == 2
+
+
+def test_bad_date_is_a_request_error():
+    with pytest.raises(RequestError):
+        _series(_server(), 'yesterday-ish', '2017-03-10', 800)
@@ -0,0 +1,102 @@
+import email.utils
+import threading
+import time
+import types
+
+import pytest
+
+from stock_profile import sources
+from stock_profile.quote_server import QuoteHandler, make_server
+from stock_profile.sources import HttpSource, SourceError
+
+
+class FlakyHandler(QuoteHandler):
+    # Answers the first ``server.failures`` requests with 503 and ``server.retry_after``.
+    def do_GET(self):
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self.server.requests += 1
+            self.send_response(503)
+            if self.server.retry_after is not None:
+                self.send_header('Retry-After', self.server.retry_after)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+@pytest.fixture
+def server():
+    server = make_server(port=0)
+    server.RequestHandlerClass = FlakyHandler
+    server.failures = 0
+    server.retry_after = None
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Patched in sources only: the quote server sleeps for its latency too.
+    calls = []
+    monkeypatch.setattr(sources, 'time', types.SimpleNamespace(
+        sleep=calls.append, time=time.time, perf_counter=time.perf_counter))
+    return calls
+
+
+def _source(server, tmp_path, **options):
+    host, port = server.server_address[:2]
+    return HttpSource(f'http://{host}:{port}', cache_dir=str(tmp_path / 'http'), **options)
+
+
+def test_tickers_are_fetched_in_batches(server, tmp_path):
+    tickers = ['NFLX', 'DJI', 'AAPL', 'MSFT', 'AMZN']
+    with _source(server, tmp_path, batch_size=2, connections=2) as source:
+        frames = source.prices(tickers, '2017-01-01', '2017-03-31')
+    assert list(frames) == tickers
+    assert all(frame.index.min() >= frames['NFLX'].index.min() for frame in frames.values())
+    assert source.stats['requests'] == server.requests == 3
+
+
+def test_503s_are_retried_with_backoff(server, tmp_path, sleeps):
+    server.failures = 2
+    with _source(server, tmp_path, backoff=0.5) as source:
+        frames = source.prices(['NFLX'])
+    assert list(frames) == ['NFLX']
+    assert sleeps == [0.5, 1.0]
+    assert (source.stats['requests'], source.stats['retries']) == (3, 2)
+
+
+def test_gives_up_after_the_last_retry(server, tmp_path, sleeps):
+    server.failures = 10
+    with _source(server, tmp_path, retries=2) as source, pytest.raises(SourceError, match='3 attempts'):
+        source.prices(['NFLX'])
+    assert server.requests == 3
+
+
+def test_retry_after_seconds(server, tmp_path, sleeps):
+    server.failures, server.retry_after = 1, '7'
+    with _source(server, tmp_path) as source:
+        source.prices(['NFLX'])
+    assert sleeps == [7.0]
+
+
+def test_retry_after_http_date(server, tmp_path, sleeps):
+    server.failures = 1
+    server.retry_after = email.utils.formatdate(time.time() + 30, usegmt=True)
+    with _source(server, tmp_path) as source:
+        source.prices(['NFLX'])
+    assert len(sleeps) == 1 and 28 <= sleeps[0] <= 30
+
+
+def test_repeated_requests_hit_the_disk_cache(server, tmp_path):
+    with _source(server, tmp_path) as source:
+        first = source.prices(['NFLX', 'DJI'])
+    with _source(server, tmp_path) as source:
+        second = source.prices(['NFLX', 'DJI'])
+    assert server.requests == 1
+    assert (source.stats['cache_hits'], source.stats['requests']) == (1, 0)
+    assert all(second[ticker].equals(first[ticker]) for ticker in first)
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from stock_profile.streaming import stream_quarterly, update_quarterly
+
+HEADER = 'Date,Price,Quarter\n'
+
+
+def _rows(start, prices, quarter='Q1'):
+    return ''.join(f'2017-01-{day:02d},{price},{quarter}\n' for day, price in enumerate(prices, start))
+
+
+def _summary(aggregates):
+    return {q: (a.count, a.min, a.max, pytest.approx(a.mean)) for q, a in aggregates.items()}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / 'prices.csv', str(tmp_path / 'state.json')
+
+
+def test_appended_rows_are_read_from_the_saved_offset(paths):
+    csv, saved = paths
+    csv.write_text(HEADER + _rows(1, [10, 11, 12]))
+    update_quarterly(str(csv), saved)
+    offset = json.load(open(saved))['offset']
+    with open(csv, 'a') as f:
+        f.write(_rows(4, [13, 14]) + '2017-04-03,20,Q2\n')
+    result = update_quarterly(str(csv), saved)
+    assert _summary(result) == _summary(stream_quarterly(str(csv)))
+    assert json.load(open(saved))['offset'] == csv.stat().st_size > offset
+
+
+def test_rewritten_file_is_rebuilt(paths):
+    csv, saved = paths
+    csv.write_text(HEADER + _rows(1, [10, 11, 12]))
+    update_quarterly(str(csv), saved)
+    csv.write_text(HEADER + _rows(1, [50, 51, 52, 53]))
+    result = update_quarterly(str(csv), saved)
+    assert _summary(result) == {'Q1': (4, 50, 53, pytest.approx(51.5))}
+
+
+def test_unterminated_last_row_is_counted_but_not_saved(paths):
+    csv, saved = paths
+    csv.write_text(HEADER + _rows(1, [10, 11]) + '2017-01-03,12,Q1')
+    first = update_quarterly(str(csv), saved)
+    assert _summary(first) == {'Q1': (3, 10, 12, pytest.approx(11))}
+    assert json.load(open(saved))['quarters']['Q1']['count'] == 2
+    with open(csv, 'a') as f:
+        f.write('\n' + _rows(4, [13]))
+    second = update_quarterly(str(csv), saved)
+    assert _summary(second) == {'Q1': (4, 10, 13, pytest.approx(11.5))}
+
+
+def test_half_written_row_is_read_again_once_finished(paths):
+    csv, saved = paths
+    csv.write_text(HEADER + _rows(1, [10, 11]) + '2017-01-03,1')
+    update_quarterly(str(csv), saved)
+    with open(csv, 'a') as f:
+        f.write('2,Q1\n')
+    result = update_quarterly(str(csv), saved)
+    assert _summary(result) == {'Q1': (3, 10, 12, pytest.approx(11))}
+
+
+def test_state_temp_files_are_cleaned_up(paths):
+    csv, saved = paths
+    csv.write_text(HEADER + _rows(1, [10, 11]))
+    update_quarterly(str(csv), saved)
+    assert [p.name for p in csv.parent.iterdir() if p.name.endswith('.tmp')] == []
@@ -0,0 +1,20 @@
+from stock_profile.streaming import QuarterAggregate
+from stock_profile.templates import TemplatePool
+
+
+def _aggregates(offset):
+    aggregates = {}
+    for i, quarter in enumerate(['Q1', 'Q2', 'Q3', 'Q4']):
+        aggregates[quarter] = QuarterAggregate()
+        aggregates[quarter].update([offset + i * 10 + step for step in range(20)])
+    return aggregates
+
+
+def test_reused_distribution_keeps_its_labels():
+    pool = TemplatePool()
+    first = pool.render('distribution', _aggregates(100), name='NFLX')
+    labels = [(ax.get_title(), ax.get_xlabel(), ax.get_ylabel()) for ax in first.axes]
+    second = pool.render('distribution', _aggregates(200), name='NFLX')
+    assert second is first
+    assert [(ax.get_title(), ax.get_xlabel(), ax.get_ylabel()) for ax in second.axes] == labels
+    assert labels[0][2] == 'Closing Stock Price'